@@ -4,7 +4,11 @@ import json
 import os
 import sys
 import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
 
+import psutil
 from option import Err, Ok, Option, Result, Some
 from selenium import webdriver
 from selenium.webdriver.common.by import By
@@ -29,37 +33,54 @@ if TYPE_CHECKING:
 
 exist = EC.presence_of_element_located
 
+# a required selector waits for twice the slowest 1% of its last appearances, once it was seen this many times
+LATENCY_SAMPLES = 200
+MIN_LATENCY_SAMPLES = 20
+MIN_ADAPTIVE_TIMEOUT = 1.0
+
 
 class Browser:
-    def __init__(self) -> None:
+    def __init__(self, user_data_dir: str = "") -> None:
+        """Start an Edge session
+        - user_data_dir: browser profile to use, defaults to `Config.USER_DATA_DIR`. A profile can't be opened by two
+        browsers at once, so concurrent instances each need their own
+        """
+        self.__user_data_dir = user_data_dir or Config.USER_DATA_DIR
+        self.__latencies: dict[str, deque[float]] = {}  # key: css selector, value: seconds it took to appear
+        self.__driver_path = Config.MSEDGE_DRIVER_PATH or EdgeChromiumDriverManager().install()
+        print(f"Edge driver path: {self.__driver_path}")
         self.__creating_folders()
+        self.__starting()
+
+    # region: helper functions
 
+    def __starting(self) -> None:
         options = webdriver.EdgeOptions()
         options.add_argument("log-level=3")  # type: ignore
         options.add_argument("start-minimized")  # type: ignore
-        options.add_argument(f"user-data-dir={os.path.abspath(Config.USER_DATA_DIR)}")  # type: ignore
+        options.add_argument(f"user-data-dir={os.path.abspath(self.__user_data_dir)}")  # type: ignore
         options.add_experimental_option("excludeSwitches", ["enable-logging"])  # type: ignore
+        options.page_load_strategy = Config.PAGE_LOAD_STRATEGY  # type: ignore
+        if Config.HEADLESS:
+            options.add_argument("headless=new")  # type: ignore
 
         self.__loading_extension(options)
 
-        if Config.MSEDGE_DRIVER_PATH == "":
-            driver_path = EdgeChromiumDriverManager().install()
-        else:
-            driver_path = Config.MSEDGE_DRIVER_PATH
-        print(f"Edge driver path: {driver_path}")
-        self.driver = webdriver.Edge(service=EdgeService(driver_path), options=options)
+        self.driver = webdriver.Edge(service=EdgeService(self.__driver_path), options=options)
+        self.__prefetched: dict[str, str] = {}  # key: url, value: window handle of the tab loading it
+        self.__scrape_profile = Config.BLOCK_RESOURCES
+        self.__page_count = 0
 
         self.__loading_cookies()
-
-    # region: helper functions
+        self.__applying_scrape_profile()
 
     def __creating_folders(self) -> None:
         if not os.path.exists(Config.EXTENSIONS_DIR):
             os.makedirs(Config.EXTENSIONS_DIR)
         if not os.path.exists(Config.COOKIES_DIR):
             os.makedirs(Config.COOKIES_DIR)
-        if not os.path.exists(Config.USER_DATA_DIR):
-            os.makedirs(Config.USER_DATA_DIR)
+        if not os.path.exists(self.__user_data_dir):
+            os.makedirs(self.__user_data_dir)
 
     def __loading_extension(self, options: Options) -> None:
         extensions = [
@@ -85,8 +106,147 @@ class Browser:
                     self.driver.execute_cdp_cmd("Network.setCookie", cookie)  # type: ignore
                 self.driver.execute_cdp_cmd("Network.disable", {})  # type: ignore
 
+    def __applying_scrape_profile(self) -> None:
+        """Block `Config.BLOCKED_URLS` (media, fonts, trackers) in the current tab. Only the DOM is scraped, media
+        elements keep their src attribute even if the file itself is never downloaded"""
+        if self.__scrape_profile:
+            self.driver.execute_cdp_cmd("Network.enable", {})  # type: ignore
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": Config.BLOCKED_URLS})  # type: ignore
+        else:
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": []})  # type: ignore
+
+    # endregion
+
+    # region: tabs
+
+    def prefetch(self, url: str) -> None:
+        """Start loading a page in a background tab without waiting for it, `open(url)` then picks it up.
+        The oldest prefetched tab is dropped when there are more than `Config.MAX_PREFETCH_TABS`"""
+        if Config.MAX_PREFETCH_TABS <= 0 or url in self.__prefetched:
+            return
+        while len(self.__prefetched) >= Config.MAX_PREFETCH_TABS:
+            self.close_tab(self.__prefetched.pop(next(iter(self.__prefetched))))
+
+        self.__prefetched[url] = self.open_tab(url)
+
+    def open(self, url: str) -> None:
+        """Navigate to a page, switching to its tab instead if it was prefetched"""
+        self.__page_count += 1
+        if (handle := self.__prefetched.pop(url, None)) is None:
+            self.driver.get(url)
+            return
+        try:
+            self.driver.close()
+            self.driver.switch_to.window(handle)
+        except:
+            self.driver.switch_to.window(self.driver.window_handles[0])
+            self.driver.get(url)
+
+    def open_tab(self, url: str) -> str:
+        """Start loading a page in a new background tab outside the prefetch pool, return its window handle"""
+        current = self.driver.current_window_handle
+        self.driver.switch_to.new_window("tab")
+        self.__page_count += 1
+        handle = self.driver.current_window_handle
+        self.__applying_scrape_profile()
+        self.driver.execute_script("window.location.href = arguments[0];", url)  # type: ignore
+        self.driver.switch_to.window(current)
+        return handle
+
+    @contextmanager
+    def switched_to(self, handle: str) -> Iterator[None]:
+        """Run a block in another tab, then come back to the current one"""
+        current = self.driver.current_window_handle
+        self.driver.switch_to.window(handle)
+        try:
+            yield
+        finally:
+            self.driver.switch_to.window(current)
+
+    def close_tab(self, handle: str) -> None:
+        try:
+            with self.switched_to(handle):
+                self.driver.close()
+        except:
+            pass
+
+    def discard_prefetched(self) -> None:
+        """Close every prefetched tab"""
+        for handle in self.__prefetched.values():
+            self.close_tab(handle)
+        self.__prefetched.clear()
+
     # endregion
 
+    # region: watchdog
+
+    def memory_usage(self) -> int:
+        """RSS in bytes of the driver and every browser process it started"""
+        try:
+            driver_process = psutil.Process(self.driver.service.process.pid)  # type: ignore
+            processes = [driver_process] + driver_process.children(recursive=True)
+        except psutil.Error:
+            return 0
+        rss = 0
+        for process in processes:
+            try:
+                rss += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return rss
+
+    def restart(self) -> None:
+        """Quit and start a fresh driver, extensions, cookies and the scrape profile are applied again"""
+        self.discard_prefetched()
+        try:
+            self.driver.quit()
+        except:
+            pass
+        self.__starting()
+
+    def recycle_if_needed(self) -> bool:
+        """Restart the browser if it went past `Config.RECYCLE_MAX_RSS_MB` or `Config.RECYCLE_MAX_PAGES`,
+        call it between posts. Return whether it restarted"""
+        reason = ""
+        if Config.RECYCLE_MAX_PAGES > 0 and self.__page_count >= Config.RECYCLE_MAX_PAGES:
+            reason = f"{self.__page_count} pages loaded"
+        elif Config.RECYCLE_MAX_RSS_MB > 0 and (rss := self.memory_usage() // 2**20) >= Config.RECYCLE_MAX_RSS_MB:
+            reason = f"using {rss} MB"
+        if not reason:
+            return False
+        print(f"Restarting the browser ({reason})...")
+        self.restart()
+        return True
+
+    def __timeout(self, css_selector: str) -> float:
+        """How long a required selector is waited for, `Config.WAIT_ELEM_TIMEOUT` until it was seen often enough"""
+        samples = self.__latencies.get(css_selector, ())
+        if not Config.ADAPTIVE_ELEM_TIMEOUT or len(samples) < MIN_LATENCY_SAMPLES:
+            return Config.WAIT_ELEM_TIMEOUT
+        p99 = sorted(samples)[max(round(len(samples) * 0.99) - 1, 0)]
+        return min(max(p99 * 2, MIN_ADAPTIVE_TIMEOUT), Config.WAIT_ELEM_TIMEOUT)
+
+    def __waiting(self, parent: WebElement | WebDriver, css_selector: str, timeout: float = 0) -> bool:
+        """Wait for a selector to be present, for the given timeout or the one learned for it"""
+        start_time = time.time()
+        try:
+            WebDriverWait(parent, timeout or self.__timeout(css_selector)).until(
+                exist((By.CSS_SELECTOR, css_selector))  # type: ignore
+            )
+            return True
+        except:
+            return False
+        finally:
+            # timing out counts too, so a selector that got slower gets a longer timeout next time
+            self.__latencies.setdefault(css_selector, deque(maxlen=LATENCY_SAMPLES)).append(time.time() - start_time)
+
+    # endregion
+
+    def set_scrape_profile(self, enabled: bool) -> None:
+        """Turn resource blocking on/off for the current tab, e.g. a login page needs its images and captchas"""
+        self.__scrape_profile = enabled and Config.BLOCK_RESOURCES
+        self.__applying_scrape_profile()
+
     def cookies_create(self, website: str, filename: str, css_presence: str = "") -> Result[None, str]:
         """Popup a browser window to login to the website and save the cookies to a file
         - website: to login to
@@ -97,6 +257,10 @@ class Browser:
         website = "https://" + website if not website.startswith("https://") else website
         filename = norm(filename) + ".json" if not filename.endswith(".json") else norm(filename)
 
+        if Config.HEADLESS:
+            return Err("Cannot log in while headless is enabled in config.yaml")
+
+        self.set_scrape_profile(False)
         self.driver.get(website)
         self.driver.maximize_window()
         input(f"Press enter after you logged in to {website}...")
@@ -104,6 +268,7 @@ class Browser:
         with open(filename, "w", encoding="utf-8") as f:
             json.dump(cookies, f)
         self.driver.minimize_window()
+        self.set_scrape_profile(True)
 
         self.driver.get(website)
         if css_presence == "":
@@ -116,11 +281,14 @@ class Browser:
             return Err("Cannot find the css selector provided. Ignore this if it's logged in.")
 
     def get_inner_html(self, parent: WebElement | WebDriver, css_selector: str, timeout: float = 1) -> str:
-        """Scrape a css selector until it's not empty, then return it
-        This function panics on purpose if the element is not found after the timeout
-        """
-        WebDriverWait(self.driver, Config.WAIT_ELEM_TIMEOUT).until(exist((By.CSS_SELECTOR, css_selector)))  # type: ignore
-        element: WebElement = parent.find_element(By.CSS_SELECTOR, css_selector)  # type: ignore
+        """Scrape a css selector until it's not empty, then return it. "" if the element isn't found in the time
+        learned for it"""
+        if not self.__waiting(self.driver, css_selector):
+            return ""
+        try:
+            element: WebElement = parent.find_element(By.CSS_SELECTOR, css_selector)  # type: ignore
+        except:
+            return ""
         content: str = element.get_attribute("innerHTML") or ""  # type: ignore
         start_time = time.time()
         while content == "":
@@ -130,21 +298,24 @@ class Browser:
         return content
 
     def get_elem(
-        self, parent: WebElement | WebDriver, css_selector: str, timeout: float = Config.WAIT_ELEM_TIMEOUT
+        self, parent: WebElement | WebDriver, css_selector: str, timeout: float = 0, required: bool = True
     ) -> Option[WebElement]:
-        """Wait + find an element"""
-        try:
-            WebDriverWait(parent, timeout).until(exist((By.CSS_SELECTOR, css_selector)))  # type: ignore
-            return Some(parent.find_element(By.CSS_SELECTOR, css_selector))  # type: ignore
-        except:
+        """Wait + find an element
+        - timeout: 0 to use the one learned for the selector
+        - required: False for elements a page may not have, they're looked up once without waiting, so call it after
+        an element the page always has was found
+        """
+        if not (elems := self.get_elems(parent, css_selector, timeout, required)):
             return Option.NONE()  # type: ignore
+        return Some(elems[0])
 
     def get_elems(
-        self, parent: WebElement | WebDriver, css_selector: str, timeout: float = Config.WAIT_ELEM_TIMEOUT
+        self, parent: WebElement | WebDriver, css_selector: str, timeout: float = 0, required: bool = True
     ) -> list[WebElement]:
-        """Wait + find elements"""
+        """Wait + find elements, same arguments as `get_elem`"""
+        if required and not self.__waiting(parent, css_selector, timeout):
+            return []
         try:
-            WebDriverWait(parent, timeout).until(exist((By.CSS_SELECTOR, css_selector)))  # type: ignore
+            return parent.find_elements(By.CSS_SELECTOR, css_selector)  # type: ignore
         except:
             return []
-        return parent.find_elements(By.CSS_SELECTOR, css_selector)  # type: ignore
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from classes.NewArtist import ArtistInfoData
+from classes.Post import Post
+from helpers.md_format import md_format
+from helpers.overwrite_sm_name import overwrite_sm_name
+
+DELIMETER = "\n`" + "—" * 20 + "`"
+CW_IRL = f"`CW: IRL content`{DELIMETER}\n"
+MESSAGE_TEMPLATE = "{head}\n[Sauce]({url}) \\| {uname}\n{social_media_links}\n_{hashtags}_\n"
+
+
+@dataclass
+class ArtistFooter:
+    fingerprint: tuple[object, ...]
+    country_flag: str
+    social_media_links: str  # already escaped
+    hashtags: list[str]  # representing hashtags + main handle + parent handles
+
+
+class Composer:
+    """Build the MarkdownV2 caption of a post. The artist's part of the caption is rendered once and reused until
+    their DB entry changes."""
+
+    def __init__(self, artists_info: dict[str, ArtistInfoData], artists_alt_handles: dict[str, set[str]]) -> None:
+        self.__artists_info = artists_info
+        self.__artists_alt_handles = artists_alt_handles
+        self.__footers: dict[str, ArtistFooter] = {}
+        self.__parents: dict[str, list[str]] = {}  # key: alt handle, value: main handles listing it
+        self.__parents_size = -1
+
+    # region: helper functions
+
+    def __parent_handles(self, handle: str) -> list[str]:
+        if self.__parents_size != len(self.__artists_alt_handles):
+            parents: dict[str, list[str]] = {}
+            for main_handle, alt_handles in self.__artists_alt_handles.items():
+                for alt_handle in alt_handles:
+                    parents.setdefault(alt_handle, []).append(main_handle)
+            self.__parents, self.__parents_size = parents, len(self.__artists_alt_handles)
+        return self.__parents.get(handle, [])
+
+    def __footer(self, artist_handle: str) -> ArtistFooter:
+        artist_obj = self.__artists_info[artist_handle]
+        fingerprint = (
+            artist_obj.country_flag,
+            artist_obj.hashtag_represent,
+            tuple(artist_obj.social_media.items()),
+            tuple(self.__parent_handles(artist_handle)),
+        )
+        if (footer := self.__footers.get(artist_handle)) is not None and footer.fingerprint == fingerprint:
+            return footer
+
+        footer = ArtistFooter(
+            fingerprint=fingerprint,
+            country_flag=artist_obj.country_flag,
+            social_media_links=", ".join(
+                f"[{md_format(overwrite_sm_name(name))}]({md_format(link)})"
+                for name, link in artist_obj.social_media.items()
+            ),
+            hashtags=artist_obj.hashtag_represent.split(" ") + [artist_handle] + list(fingerprint[3]),  # type: ignore
+        )
+        self.__footers[artist_handle] = footer
+        return footer
+
+    # endregion
+
+    def invalidate(self, artist_handle: str = "") -> None:
+        """Drop the cached footer of an artist, or of everyone if no handle is given"""
+        if artist_handle:
+            self.__footers.pop(artist_handle, None)
+        else:
+            self.__footers.clear()
+        self.__parents_size = -1
+
+    def compose(
+        self,
+        post: Post,
+        artist_uname: str,
+        artist_handle: str,
+        all_handles: list[str],
+        more_hashtags: list[str],
+        is_irl: bool = False,
+    ) -> str:
+        footer = self.__footer(artist_handle)
+
+        post.content = md_format(post.content)
+        post.url = md_format(post.url)
+
+        if footer.country_flag not in artist_uname:
+            artist_uname += " " + footer.country_flag
+
+        # ordered set, "#Foo" and "foo" are the same hashtag
+        hashtags: dict[str, str] = {}
+        for hashtag in footer.hashtags + all_handles + more_hashtags + [hashtag[0] for hashtag in post.hashtag_link]:
+            if (hashtag := hashtag.strip().lstrip("#")) and (key := hashtag.casefold()) not in hashtags:
+                hashtags[key] = hashtag
+        video_hashtag = "#ANI " if post.media_type == "video" else ""
+
+        head = f"{CW_IRL if is_irl else ''}{post.content}{DELIMETER if post.content else ''}"
+        return MESSAGE_TEMPLATE.format(
+            head="\n".join(line.strip() for line in head.split("\n")),
+            url=post.url,
+            uname=md_format(artist_uname).strip(),
+            social_media_links=footer.social_media_links,
+            hashtags=md_format(video_hashtag + " ".join(f"#{hashtag}" for hashtag in hashtags.values())),
+        )
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import queue
+import re
+import threading
+from dataclasses import dataclass, field
+
+from option import Err, Ok, Result
+
+from classes.Browser import Browser
+from classes.Composer import Composer
+from classes.ImageHashIndex import ImageHashIndex, MediaHash
+from classes.ImagePreprocessor import FittedImage, ImagePreprocessor
+from classes.NewArtist import ArtistInfoData
+from classes.Post import Post
+from classes.SentIndex import SentIndex
+from classes.TelegramUpdates import TelegramUpdates
+from helpers.artists_info_load_save import artists_info_load
+from helpers.find_main_handle import find_main_handle
+from helpers.insensitive_match import insensitive_match  # type: ignore
+from helpers.invalid_sm_links import check_invalid_links
+from helpers.load_config import reload_config
+from helpers.match_host import match_host
+from helpers.print_sign import print_sign
+from helpers.send_telegram_message import send_telegram_message
+from variables.Config import Config
+from variables.Message import DaemonMsg
+
+
+@dataclass
+class DaemonJob:
+    url: str
+    chat_id: int
+    message_id: int
+    is_irl: bool = False
+    is_thread: bool = False
+
+    canonical_url: str = ""
+    post: Post = field(default_factory=Post)
+    message: str = ""
+    media_hashes: dict[str, MediaHash] = field(default_factory=dict)
+    uploads: dict[str, FittedImage] = field(default_factory=dict)
+
+
+class Daemon:
+    """Headless mode: post urls sent to the bot are queued, scraped + composed by background workers, and a preview is
+    replied to the submitter. Replying `/send` to a preview posts it to every chat in `Config.CHAT_ID`."""
+
+    def __init__(self) -> None:
+        self.__artists_info: dict[str, ArtistInfoData] = {}
+        self.__artists_alt_handles: dict[str, set[str]] = {}
+        self.__artists_info, self.__artists_alt_handles = artists_info_load()
+        self.__composer = Composer(self.__artists_info, self.__artists_alt_handles)
+        self.__sent_index = SentIndex()
+        self.__image_hashes = ImageHashIndex()
+        self.__preprocessor = ImagePreprocessor()
+
+        self.__updates = TelegramUpdates()
+        self.__jobs: queue.Queue[DaemonJob | None] = queue.Queue()
+        self.__previews: dict[tuple[int, int], DaemonJob] = {}  # key: (chat id, preview message id)
+        self.__lock = threading.Lock()
+        self.__workers: list[threading.Thread] = []
+
+        self.__updates.on_command("/send", self.__on_send)
+        self.__updates.on_command("/cancel", self.__on_cancel)
+        self.__updates.on_command("/irl", self.__on_post_url)
+        self.__updates.on_command("/thread", self.__on_post_url)
+        self.__updates.on_message(self.__on_post_url)
+
+    # region: telegram handlers
+
+    def __reply(self, message: dict, text: str, **kwargs) -> Result[dict, str]:  # type: ignore
+        with self.__lock:
+            return self.__updates.send_message(
+                message["chat"]["id"], text, reply_to_message_id=message["message_id"], **kwargs
+            )
+
+    def __is_submitter(self, message: dict) -> bool:  # type: ignore
+        user = message.get("from") or message["chat"]
+        ids = [str(user["id"]), str(message["chat"]["id"])]
+        if username := user.get("username"):
+            ids += [username, f"@{username}"]
+        return any(insensitive_match(id_, Config.DAEMON_SUBMITTERS).is_some for id_ in ids)
+
+    def __on_post_url(self, message: dict) -> None:  # type: ignore
+        if not self.__is_submitter(message):
+            self.__reply(message, DaemonMsg.NOT_A_SUBMITTER.format(message["chat"]["id"]))
+            return
+        text: str = message.get("text", "")
+        command = text.strip().lower().split(" ")[0].split("@")[0]
+        urls = re.findall(r"https?://\S+", text)
+        if not urls:
+            self.__reply(message, DaemonMsg.NO_URL)
+            return
+        for url in urls:
+            self.__jobs.put(
+                DaemonJob(url, message["chat"]["id"], message["message_id"], command == "/irl", command == "/thread")
+            )
+        self.__reply(message, DaemonMsg.QUEUED.format(len(urls), self.__jobs.qsize()))
+
+    def __pop_preview(self, message: dict) -> DaemonJob | None:  # type: ignore
+        if (preview := message.get("reply_to_message")) is None:
+            return None
+        with self.__lock:
+            if (job := self.__previews.pop((message["chat"]["id"], preview["message_id"]), None)) is None:
+                return None
+            for key in [key for key, value in self.__previews.items() if value is job]:
+                del self.__previews[key]
+            return job
+
+    def __on_send(self, message: dict) -> None:  # type: ignore
+        if not self.__is_submitter(message):
+            return
+        if (job := self.__pop_preview(message)) is None:
+            self.__reply(message, DaemonMsg.REPLY_TO_PREVIEW)
+            return
+        if (
+            res := send_telegram_message(
+                job.message, job.post.media, job.post.media_type, job.is_irl, job.media_hashes, job.uploads
+            )
+        ).is_ok:
+            self.__sent_index.add(job.canonical_url, res.unwrap())
+            self.__image_hashes.add(job.canonical_url, [hash_.dhash for hash_ in job.media_hashes.values()])
+            self.__reply(message, DaemonMsg.SENT)
+        else:
+            self.__reply(message, DaemonMsg.ERROR.format(job.url, res.unwrap_err()))
+
+    def __on_cancel(self, message: dict) -> None:  # type: ignore
+        if not self.__is_submitter(message):
+            return
+        if self.__pop_preview(message) is None:
+            self.__reply(message, DaemonMsg.REPLY_TO_PREVIEW)
+            return
+        self.__reply(message, DaemonMsg.CANCELLED)
+
+    # endregion
+
+    # region: workers
+
+    def __process(self, job: DaemonJob, browser: Browser) -> Result[list[str], str]:
+        """Scrape + compose a job without asking anything, return warnings to show with the preview"""
+        if (platform_ := match_host(job.url, browser)).is_err:
+            return Err(platform_.unwrap_err())
+        platform = platform_.unwrap()
+        if (canonical_url := platform.has_the_pattern(job.url)).is_none:
+            return Err(DaemonMsg.DOESNT_MATCH_PATTERN)
+        job.canonical_url = canonical_url.unwrap()
+        if job.canonical_url in self.__sent_index:
+            return Err(DaemonMsg.ALREADY_SENT)
+        if (post_ := platform.scrape_thread(job.url) if job.is_thread else platform.scrape(job.url)).is_none:
+            return Err(DaemonMsg.SCRAPE_FAILED)
+        job.post = post_.unwrap()
+
+        if insensitive_match(job.post.handle, Config.BLACKLIST_ACCOUNTS).is_some:
+            return Err(DaemonMsg.BLACKLISTED.format(job.post.handle))
+        if (
+            artist_handle_ := find_main_handle(job.post.handle, self.__artists_alt_handles, self.__artists_info)
+        ).is_none:
+            return Err(DaemonMsg.ARTIST_NOT_FOUND.format(job.post.handle))
+        artist_handle = artist_handle_.unwrap()
+
+        warnings: list[str] = []
+        if (invalid_links := check_invalid_links(self.__artists_info[artist_handle].social_media, browser)).is_some:
+            warnings.append(DaemonMsg.INVALID_LINKS.format(", ".join(invalid_links.unwrap().keys())))
+        if job.post.media_type == "photo" and (Config.REPOST_DETECTION or Config.PREPROCESS_IMAGES):
+            job.media_hashes, job.uploads = self.__preprocessor.prepare(job.post.media)
+        repost = self.__image_hashes.find([hash_.dhash for hash_ in job.media_hashes.values()])
+        if Config.REPOST_DETECTION and repost.is_some:
+            warnings.append(DaemonMsg.LIKELY_REPOST.format(*repost.value))
+
+        all_handles = [job.post.handle] + [m[0] for m in job.post.mention_link if m[0] != job.post.handle]
+        job.message = self.__composer.compose(job.post, job.post.username, artist_handle, all_handles, [], job.is_irl)
+        return Ok(warnings)
+
+    def __worker(self, index: int) -> None:
+        browser = Browser(Config.USER_DATA_DIR if index == 0 else f"{Config.USER_DATA_DIR}_{index}")
+        try:
+            while (job := self.__jobs.get()) is not None:
+                reload_config()
+                browser.recycle_if_needed()
+                origin = {"chat": {"id": job.chat_id}, "message_id": job.message_id}
+                try:
+                    res = self.__process(job, browser)
+                except Exception as e:
+                    res = Err(str(e))
+                if res.is_err:
+                    self.__reply(origin, DaemonMsg.ERROR.format(job.url, res.unwrap_err()))
+                    continue
+
+                preview = self.__reply(origin, job.message, parse_mode="MarkdownV2", disable_web_page_preview=True)
+                if preview.is_err:
+                    self.__reply(origin, DaemonMsg.ERROR.format(job.url, preview.unwrap_err()))
+                    continue
+                preview_id: int = preview.unwrap()["message_id"]
+                confirm = self.__reply(
+                    {"chat": {"id": job.chat_id}, "message_id": preview_id},
+                    "\n".join(res.unwrap() + [DaemonMsg.CONFIRM.format(len(job.post.media))]),
+                )
+                # /send works as a reply to either the preview or the confirmation prompt
+                with self.__lock:
+                    self.__previews[(job.chat_id, preview_id)] = job
+                    if confirm.is_ok:
+                        self.__previews[(job.chat_id, confirm.unwrap()["message_id"])] = job
+        finally:
+            browser.driver.quit()
+
+    # endregion
+
+    def run(self) -> None:
+        for index in range(max(Config.DAEMON_WORKERS, 1)):
+            worker = threading.Thread(target=self.__worker, args=(index,), daemon=True)
+            worker.start()
+            self.__workers.append(worker)
+
+        print_sign(DaemonMsg.LISTENING.format(len(self.__workers)))
+        try:
+            self.__updates.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            print(DaemonMsg.CLOSING)
+            for _ in self.__workers:
+                self.__jobs.put(None)
+            for worker in self.__workers:
+                worker.join()
+            self.__preprocessor.close()
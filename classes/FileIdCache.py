@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+
+from option import Option, Some
+
+from variables.Config import Config
+
+
+class FileIdCache:
+    """Telegram `file_id`s of media the bot already sent, by source url and by content digest. Sending a `file_id`
+    instead of the url skips Telegram fetching (and us uploading) the file again."""
+
+    def __init__(self, path: str = "") -> None:
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path or Config.FILE_ID_CACHE_FILE, check_same_thread=False)
+        self.__db.execute("CREATE TABLE IF NOT EXISTS file_ids (key TEXT PRIMARY KEY, media_type TEXT, file_id TEXT)")
+        self.__db.commit()
+
+    def get(self, key: str, media_type: str) -> Option[str]:
+        """The file_id stored for a url or digest, if it was sent as the same type of media"""
+        with self.__lock:
+            row = self.__db.execute(
+                "SELECT file_id FROM file_ids WHERE key = ? AND media_type = ?", (key, media_type)
+            ).fetchone()
+        return Option.NONE() if row is None else Some(row[0])  # type: ignore
+
+    def add(self, keys: list[str], media_type: str, file_id: str) -> None:
+        with self.__lock:
+            self.__db.executemany(
+                "INSERT OR REPLACE INTO file_ids (key, media_type, file_id) VALUES (?, ?, ?)",
+                [(key, media_type, file_id) for key in keys if key],
+            )
+            self.__db.commit()
+
+    def discard(self, file_ids: list[str]) -> None:
+        """Forget file_ids Telegram refused"""
+        with self.__lock:
+            self.__db.executemany("DELETE FROM file_ids WHERE file_id = ?", [(file_id,) for file_id in file_ids])
+            self.__db.commit()
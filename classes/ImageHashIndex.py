@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import requests
+from option import Option, Some
+from PIL import Image
+
+from variables.Config import Config
+
+# bits set in every byte value, for numpy versions without np.bitwise_count
+POPCOUNT_8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def dhash(data: bytes) -> int:
+    """64-bit difference hash of an image: survives re-encoding, resizing and small crops/edits"""
+    with Image.open(io.BytesIO(data)) as image:
+        pixels = np.asarray(image.convert("L").resize((9, 8), Image.Resampling.LANCZOS), dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+@dataclass
+class MediaHash:
+    dhash: int  # perceptual, equal-ish for the same artwork
+    digest: str  # of the exact bytes
+
+
+def fetch_media(media_urls: list[str]) -> dict[str, bytes]:
+    """Download the media in parallel, the ones that can't be fetched are left out"""
+
+    def fetch(url: str) -> bytes | None:
+        try:
+            respond = requests.get(url, timeout=Config.MEDIA_DOWNLOAD_TIMEOUT)
+            respond.raise_for_status()
+            return respond.content
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max(len(media_urls), 1)) as executor:
+        media = executor.map(fetch, media_urls)
+        return {url: data for url, data in zip(media_urls, media) if data is not None}
+
+
+def hash_media(media: dict[str, bytes]) -> dict[str, MediaHash]:
+    """Hash downloaded images by url, the ones that can't be decoded are left out"""
+    hashes: dict[str, MediaHash] = {}
+    for url, data in media.items():
+        try:
+            hashes[url] = MediaHash(dhash(data), hashlib.blake2b(data, digest_size=16).hexdigest())
+        except Exception:
+            continue
+    return hashes
+
+
+def popcount(array: np.ndarray) -> np.ndarray:  # type: ignore
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(array)  # type: ignore
+    return POPCOUNT_8[array.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint8)
+
+
+class ImageHashIndex:
+    """Perceptual hashes of every sent image and the post each one was sent with, to spot the same artwork reposted
+    under another url. The hashes live in one growing uint64 array, stored as `<path>.bin` next to the post urls in
+    `<path>.urls`, both append-only."""
+
+    def __init__(self, path: str = "") -> None:
+        self.__path = path or Config.IMAGE_HASH_INDEX_FILE
+        self.__lock = threading.Lock()
+        self.__urls: list[str] = []
+        self.__hashes = np.zeros(1024, dtype=np.uint64)
+        self.__size = 0
+        self.__loading()
+
+    # region: helper functions
+
+    def __loading(self) -> None:
+        if not os.path.isfile(f"{self.__path}.bin") or not os.path.isfile(f"{self.__path}.urls"):
+            return
+        hashes = np.fromfile(f"{self.__path}.bin", dtype="<u8")
+        with open(f"{self.__path}.urls", mode="r", encoding="utf-8") as f:
+            urls = f.read().splitlines()
+        # a crash between the two appends leaves one file a record longer
+        self.__size = min(len(hashes), len(urls))
+        self.__urls = urls[: self.__size]
+        self.__hashes = np.zeros(max(self.__size * 2, 1024), dtype=np.uint64)
+        self.__hashes[: self.__size] = hashes[: self.__size]
+
+    def __growing(self, size: int) -> None:
+        if size > len(self.__hashes):
+            hashes = np.zeros(max(size, len(self.__hashes) * 2), dtype=np.uint64)
+            hashes[: self.__size] = self.__hashes[: self.__size]
+            self.__hashes = hashes
+
+    # endregion
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def find(self, hashes: list[int], max_distance: int = -1) -> Option[tuple[str, int]]:
+        """The post url of the closest sent image to any of `hashes` and their distance in bits, if one is within
+        `max_distance` (`Config.REPOST_MAX_DISTANCE` by default)"""
+        max_distance = Config.REPOST_MAX_DISTANCE if max_distance < 0 else max_distance
+        with self.__lock:
+            indexed = self.__hashes[: self.__size]
+            best: tuple[str, int] | None = None
+            for hash_ in hashes:
+                if self.__size == 0:
+                    break
+                distances = popcount(np.bitwise_xor(indexed, np.uint64(hash_)))
+                index = int(np.argmin(distances))
+                if (distance := int(distances[index])) <= max_distance and (best is None or distance < best[1]):
+                    best = (self.__urls[index], distance)
+        return Option.NONE() if best is None else Some(best)  # type: ignore
+
+    def add(self, url: str, hashes: list[int]) -> None:
+        if not hashes:
+            return
+        with self.__lock:
+            self.__growing(self.__size + len(hashes))
+            self.__hashes[self.__size : self.__size + len(hashes)] = np.array(hashes, dtype=np.uint64)
+            self.__size += len(hashes)
+            self.__urls.extend([url] * len(hashes))
+            with open(f"{self.__path}.bin", mode="ab") as f:
+                f.write(np.array(hashes, dtype="<u8").tobytes())
+            with open(f"{self.__path}.urls", mode="a", encoding="utf-8") as f:
+                f.write("".join(f"{url}\n" for _ in hashes))
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import io
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from PIL import Image
+
+from classes.ImageHashIndex import MediaHash, fetch_media, hash_media
+from variables.Config import Config
+
+# Telegram refuses photos whose width + height is above this
+MAX_WIDTH_PLUS_HEIGHT = 10000
+
+
+def _fit(data: bytes, max_side: int, max_bytes: int) -> bytes:
+    """Re-encode an image that is over the limits as a JPEG within them, b"" if it already fits. Runs in a worker
+    process"""
+    with Image.open(io.BytesIO(data)) as image:
+        width, height = image.size
+        if len(data) <= max_bytes and max(width, height) <= max_side and width + height <= MAX_WIDTH_PLUS_HEIGHT:
+            return b""
+        if image.mode in ("RGBA", "LA", "P"):
+            image = image.convert("RGBA")
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A"))
+            image = background
+        else:
+            image = image.convert("RGB")
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+        for quality in (90, 80, 70, 60):
+            output = io.BytesIO()
+            image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+            if output.tell() <= max_bytes:
+                break
+        return output.getvalue()
+
+
+@dataclass
+class FittedImage:
+    data: bytes  # uploaded as the photo
+    original: bytes  # uploaded as a document next to it, if enabled
+
+
+class ImagePreprocessor:
+    """Shrinks images that are too big for Telegram to send as photos in a pool of processes, so the main loop keeps
+    going while they're re-encoded"""
+
+    def __init__(self, processes: int = 0) -> None:
+        self.__processes = processes or Config.PREPROCESS_PROCESSES
+        self.__executor: ProcessPoolExecutor | None = None
+
+    def fit(self, media: dict[str, bytes]) -> dict[str, FittedImage]:
+        """Return the re-encoded images by url, only the ones that needed it"""
+        if not media:
+            return {}
+        if self.__executor is None:
+            self.__executor = ProcessPoolExecutor(max(self.__processes, 1))
+        futures = {
+            url: self.__executor.submit(_fit, data, Config.PHOTO_MAX_SIDE, Config.PHOTO_MAX_MB * 1024 * 1024)
+            for url, data in media.items()
+        }
+        fitted: dict[str, FittedImage] = {}
+        for url, future in futures.items():
+            try:
+                if data := future.result():
+                    fitted[url] = FittedImage(data, media[url])
+            except Exception:
+                continue  # can't decode it, let Telegram try the url
+        return fitted
+
+    def prepare(self, media_urls: list[str]) -> tuple[dict[str, MediaHash], dict[str, FittedImage]]:
+        """Download a post's images once, return their hashes and (if enabled) the re-encoded ones, by url"""
+        media = fetch_media(media_urls)
+        return hash_media(media), self.fit(media) if Config.PREPROCESS_IMAGES else {}
+
+    def close(self) -> None:
+        if self.__executor is not None:
+            self.__executor.shutdown(cancel_futures=True)
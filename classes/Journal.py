@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any
+
+from variables.Config import Config
+
+
+class Journal:
+    """Append-only JSONL log of what was done for each post, one line per completed stage (scraped, answered,
+    composed, then sent or dropped), so a crashed or killed session can pick up its unfinished posts where they
+    stopped instead of scraping and asking again"""
+
+    def __init__(self, path: str = "") -> None:
+        self.__path = path or Config.JOURNAL_FILE
+        self.__lock = threading.Lock()
+        self.__states: dict[str, dict[str, Any]] = {}  # key: canonical url, value: data of each completed stage
+        self.__loading()
+        self.__file = open(self.__path, mode="a", encoding="utf-8")
+
+    # region: helper functions
+
+    def __loading(self) -> None:
+        if not os.path.isfile(self.__path):
+            return
+        with open(self.__path, mode="r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # the last line of a killed session can be cut short
+                self.__states.setdefault(entry["url"], {})[entry["stage"]] = entry["data"]
+
+        # only the unfinished posts are worth keeping, rewrite the file without the rest
+        self.__states = {url: stages for url, stages in self.__states.items() if not self.__is_done(stages)}
+        with open(f"{self.__path}.tmp", mode="w", encoding="utf-8") as f:
+            for url, stages in self.__states.items():
+                for stage, data in stages.items():
+                    f.write(json.dumps({"url": url, "stage": stage, "data": data}, ensure_ascii=False) + "\n")
+        os.replace(f"{self.__path}.tmp", self.__path)
+
+    @staticmethod
+    def __is_done(stages: dict[str, Any]) -> bool:
+        return "sent" in stages or "dropped" in stages
+
+    # endregion
+
+    def record(self, url: str, stage: str, **data: Any) -> None:
+        """Write down that a stage of a post is done, along with what's needed to continue from it"""
+        line = json.dumps({"url": url, "stage": stage, "data": data, "at": time.time()}, ensure_ascii=False)
+        with self.__lock:
+            self.__file.write(line + "\n")
+            self.__file.flush()
+            os.fsync(self.__file.fileno())
+            self.__states.setdefault(url, {})[stage] = data
+
+    def state(self, url: str) -> dict[str, Any]:
+        """Data of the completed stages of an unfinished post by stage name, empty if there's nothing to resume"""
+        with self.__lock:
+            stages = self.__states.get(url, {})
+            return {} if self.__is_done(stages) else dict(stages)
+
+    def pending(self) -> list[str]:
+        """Urls of the posts that were started but neither sent nor dropped"""
+        with self.__lock:
+            return [url for url, stages in self.__states.items() if not self.__is_done(stages)]
+
+    def close(self) -> None:
+        self.__file.close()
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+
+from option import Option, Some
+
+from variables.Config import Config
+
+
+class LinkCache:
+    """Social links that were found valid recently, so posting doesn't check them again until
+    `Config.LINK_CACHE_TTL_HOURS` pass. Invalid ones aren't kept, they're checked (and fixed) when they come up"""
+
+    def __init__(self, path: str = "") -> None:
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path or Config.LINK_CACHE_FILE, check_same_thread=False)
+        self.__db.execute("CREATE TABLE IF NOT EXISTS valid_links (url TEXT PRIMARY KEY, status TEXT, checked_at REAL)")
+        self.__db.commit()
+
+    def get(self, url: str) -> Option[str]:
+        """The status the url was found valid with, if that was within the TTL"""
+        with self.__lock:
+            row = self.__db.execute(
+                "SELECT status FROM valid_links WHERE url = ? AND checked_at > ?",
+                (url, time.time() - Config.LINK_CACHE_TTL_HOURS * 3600),
+            ).fetchone()
+        return Option.NONE() if row is None else Some(row[0])  # type: ignore
+
+    def add(self, statuses: dict[str, str]) -> None:
+        """Remember urls as valid, by url: status"""
+        with self.__lock:
+            self.__db.executemany(
+                "INSERT OR REPLACE INTO valid_links (url, status, checked_at) VALUES (?, ?, ?)",
+                [(url, status, time.time()) for url, status in statuses.items()],
+            )
+            self.__db.commit()
+
+    def discard(self, urls: list[str]) -> None:
+        with self.__lock:
+            self.__db.executemany("DELETE FROM valid_links WHERE url = ?", [(url,) for url in urls])
+            self.__db.commit()
@@ -6,6 +6,39 @@ from option import Option, Some
 from helpers.insensitive_match import insensitive_match  # type: ignore
 from variables.Message import NewArtistMsg
 
+# host -> pattern capturing the handle from the path of a link to that host, subdomains of the host match too
+ALT_HANDLE_PATHS: dict[str, re.Pattern[str]] = {
+    "twitter.com": re.compile(r"^/([^/?#]+)"),
+    "instagram.com": re.compile(r"^/([^/?#]+)"),
+    "furaffinity.net": re.compile(r"^/user/([^/?#]+)"),
+    "patreon.com": re.compile(r"^/([^/?#]+)"),
+    "skeb.jp": re.compile(r"^/@([^/?#]+)"),
+    "ko-fi.com": re.compile(r"^/([^/?#]+)"),
+    "linktr.ee": re.compile(r"^/([^/?#]+)"),
+    "t.me": re.compile(r"^/([^/?#]+)"),
+    "itaku.ee": re.compile(r"^/profile/([^/?#]+)"),
+    "picarto.tv": re.compile(r"^/([^/?#]+)"),
+}
+# hosts where the handle is the subdomain, e.g. <handle>.gumroad.com
+ALT_HANDLE_SUBDOMAINS = {"gumroad.com", "fanbox.cc"}
+
+LINK_REGEX = re.compile(r"^(?:[a-zA-Z][a-zA-Z0-9+.-]*://)?([^/?#:]+)(?::\d+)?([^?#]*)")
+
+
+def parse_alt_handle(link: str) -> str:
+    """Return the handle in a social media link, or "" if the host isn't known"""
+    if not (match := LINK_REGEX.match(link.strip())):
+        return ""
+    labels = match.group(1).lower().removeprefix("www.").split(".")
+    # walk up the domain: a.b.twitter.com -> b.twitter.com -> twitter.com
+    for i in range(len(labels) - 1):
+        host = ".".join(labels[i:])
+        if (pattern := ALT_HANDLE_PATHS.get(host)) is not None:
+            return handle.group(1) if (handle := pattern.match(match.group(2))) else ""
+        if host in ALT_HANDLE_SUBDOMAINS:
+            return labels[i - 1] if i > 0 else ""
+    return ""
+
 
 @dataclass
 class ArtistInfoData:
@@ -14,6 +47,17 @@ class ArtistInfoData:
     social_media: dict[str, str] = field(default_factory=dict)
 
 
+def rm_dupl_handles(alt_handles: set[str], artist_handle: str) -> set[str]:
+    """Set is case sensitive, this will make it case insensitive, also drop empty handles and the artist's own"""
+    lowered: set[str] = {"", artist_handle.casefold()}
+    result: set[str] = set()
+    for handle in alt_handles:
+        if handle.casefold() not in lowered:
+            lowered.add(handle.casefold())
+            result.add(handle)
+    return result
+
+
 class NewArtist:
     def __init__(
         self,
@@ -46,56 +90,10 @@ class NewArtist:
         return processed_links
 
     def process_alt_handles(self, social_media: dict[str, str]) -> set[str]:
-        alt_handles: set[str] = set()
-
-        def helper(pattern: str, val: str, match_group: int = 1):
-            nonlocal alt_handles
-            if match := re.search(pattern, val):
-                alt_handles.add(match.group(match_group))
-
-        for _, link in social_media.items():
-            match link:
-                case link if "twitter.com" in link.lower():
-                    helper(r"twitter.com\/([^/]+)\/?", link)
-                case link if "instagram.com" in link.lower():
-                    helper(r"instagram.com\/([^/]+)\/?", link)
-                case link if "furaffinity.net" in link.lower():
-                    helper(r"furaffinity.net\/user\/([^/]+)\/?", link)
-                case link if "patreon.com" in link.lower():
-                    helper(r"patreon.com\/([^/]+)\/?", link)
-                case link if "gumroad.com" in link.lower():
-                    helper(r"(?:https?:\/\/)?(?:www\.)?([^\/]+)\.gumroad\.com\/?", link)
-                case link if "skeb.jp" in link.lower():
-                    helper(r"skeb\.jp\/@([^/]+)\/?", link)
-                case link if "ko-fi.com" in link.lower():
-                    helper(r"ko-fi\.com\/([^/]+)\/?", link)
-                case link if "linktr.ee" in link.lower():
-                    helper(r"linktr\.ee\/([^/]+)\/?", link)
-                case link if "t.me" in link.lower():
-                    helper(r"t\.me\/([^/]+)\/?", link)
-                case link if "fanbox.cc" in link.lower():
-                    helper(r"(?:https?:\/\/)?(?:www\.)?([^\/]+)\.fanbox\.cc\/?", link)
-                case link if "itaku.ee" in link.lower():
-                    helper(r"itaku\.ee\/profile\/([^/]+)\/?", link)
-                case link if "picarto.tv" in link.lower():
-                    helper(r"picarto\.tv\/([^/]+)\/?", link)
-                case _:
-                    pass
+        alt_handles = {parse_alt_handle(link) for link in social_media.values()}
         if match := insensitive_match(self.__artist_handle, self.__artists_alt_handles.keys()):
             alt_handles.update(self.__artists_alt_handles[match.value])
-        alt_handles.discard("")
-        alt_handles.discard(self.__artist_handle)
-        return self.__rm_dupl_handles(alt_handles)
-
-    def __rm_dupl_handles(self, alt_handles: set[str]) -> set[str]:
-        """Set is case sensitive, this will make it case insensitive"""
-        lowered: set[str] = set()
-        result: set[str] = set()
-        for handle in alt_handles:
-            if handle.lower() not in lowered:
-                lowered.add(handle.lower())
-                result.add(handle)
-        return result
+        return rm_dupl_handles(alt_handles, self.__artist_handle)
 
     def new(self) -> Option[str]:
         """Return 0 if user wants to exit"""
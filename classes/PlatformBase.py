@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import sys
 from abc import ABC, abstractmethod
+from typing import Callable
 
 from option import Option
 
@@ -38,3 +39,16 @@ class PlatformBase(ABC):
     def get_username(self, handle: str) -> Option[str]:
         """Get the username of a handle"""
         raise NotImplementedError
+
+    def scrape_thread(self, input_url: str) -> Option[Post]:
+        """Scrape the post together with the rest of the author's thread it's part of, if the platform has threads"""
+        return self.scrape(input_url)
+
+    def list_posts(self, url: str, is_known: Callable[[str], bool]) -> Option[list[str]]:
+        """If the url is a gallery/listing page, the canonical urls of the posts in it, newest first, without the ones
+        `is_known` returns True for (platforms whose listings are strictly ordered stop reading at the first of them)"""
+        return Option.NONE()  # type: ignore
+
+    def username_url(self, handle: str) -> Option[str]:
+        """The page `get_username` loads for a handle, if any, so it can be prefetched"""
+        return Option.NONE()  # type: ignore
@@ -4,12 +4,15 @@ import re
 import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from html import unescape
+from itertools import count
+from typing import Callable
 
 from option import Option, Some
 from selenium.webdriver.common.by import By
 
 from classes.PlatformBase import PlatformBase
 from classes.Post import Post
+from variables.Config import Config
 
 if sys.version_info >= (3, 11):
     from typing import TYPE_CHECKING
@@ -20,12 +23,16 @@ if TYPE_CHECKING:
 
     from classes.Browser import Browser
 
+# every FA page ends with its footer, once it's there the page is too
+PAGE_END = "#footer, .footer, footer"
+
 
 class PlatformFA(PlatformBase):
     def __init__(self, browser: Browser) -> None:
         self.title = "FurAffinity"
         self.post = "submission"
         self.__driver = browser.driver
+        self.__open = browser.open
         self.__get_inner_html = browser.get_inner_html
         self.__get_elem = browser.get_elem
         self.__get_elems = browser.get_elems
@@ -38,6 +45,34 @@ class PlatformFA(PlatformBase):
     def get_username(self, handle: str) -> Option[str]:
         return Some(handle)
 
+    def list_posts(self, url: str, is_known: Callable[[str], bool]) -> Option[list[str]]:
+        """Submissions of a /gallery/<user>/ or /scraps/<user>/ (or a folder of them), page after page"""
+        if not (match := re.match(r".*\/(gallery|scraps)\/([^\/?#]+)(\/folder\/\d+\/[^\/?#]+)?", url)):
+            return Option.NONE()  # type: ignore
+        listing = f"https://www.furaffinity.net/{match.group(1)}/{match.group(2)}{match.group(3) or ''}/"
+
+        posts: list[str] = []
+        seen: set[str] = set()
+        for page in count(1):
+            self.__open(f"{listing}{page}/")
+            # past the last page there's no submission to wait for, so wait for the end of the page instead
+            self.__get_elem(self.__driver, PAGE_END)
+            ids = [
+                (figure.get_attribute("id") or "").removeprefix("sid-")  # type: ignore
+                for figure in self.__get_elems(self.__driver, "figure[id^='sid-']", required=False)
+            ]
+            # past the last page FA shows an empty one
+            if not (ids := [id_ for id_ in ids if id_ and id_ not in seen]):
+                break
+            for id_ in ids:
+                seen.add(id_)
+                if is_known(post := f"https://www.furaffinity.net/view/{id_}"):
+                    return Some(posts)
+                posts.append(post)
+                if len(posts) >= Config.GALLERY_MAX_POSTS:
+                    return Some(posts)
+        return Some(posts)
+
     def __process_content(self, content: str) -> str:
         """HTML -> Markdown + clean up"""
         content = re.sub(r"<br>", "\n", content)
@@ -105,7 +140,7 @@ class PlatformFA(PlatformBase):
     def __scrape_image(self) -> str:
         """Scrape image from page"""
         # .favorite-nav > a.innerHTML == Download > a.href
-        elems = self.__get_elems(self.__driver, ".favorite-nav > a")
+        elems = self.__get_elems(self.__driver, ".favorite-nav > a", required=False)
         if len(elems) == 0:
             return ""
         for elem in elems:
@@ -120,27 +155,28 @@ class PlatformFA(PlatformBase):
 
     def scrape(self, input_url: str) -> Option[Post]:
         input_url = self.has_the_pattern(input_url).value
-        self.__driver.get(input_url)
+        self.__open(input_url)
         if (submission_ := self.__get_elem(self.__driver, ".submission-content")).is_none:
             return Option.NONE()  # type: ignore
         submission = submission_.value
 
         pfp = (
             ""
-            if (pfp_ := self.__get_elem(submission, ".submission-user-icon")).is_none
+            if (pfp_ := self.__get_elem(submission, ".submission-user-icon", required=False)).is_none
             else pfp_.value.get_attribute("src") or ""  # type: ignore
         )
-        username = self.__get_inner_html(submission, ".submission-id-sub-container a strong")
+        if not (username := self.__get_inner_html(submission, ".submission-id-sub-container a strong")):
+            return Option.NONE()  # type: ignore
 
         content = self.__process_content(self.__get_inner_html(submission, ".submission-description"))
         image = self.__scrape_image()
         date = (
             ""
-            if (date_ := self.__get_elem(submission, ".popup_date")).is_none
+            if (date_ := self.__get_elem(submission, ".popup_date", required=False)).is_none
             else date_.value.get_attribute("title") or ""  # type: ignore
         )
 
-        if (stats_ := self.__get_elem(self.__driver, ".submission-sidebar .stats-container")).is_none:
+        if (stats_ := self.__get_elem(self.__driver, ".submission-sidebar .stats-container", required=False)).is_none:
             stats = WebElement
             views, comments, favorites, rating = "", "", "", ""
         else:
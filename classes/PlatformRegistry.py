@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import importlib
+import sys
+from dataclasses import dataclass, field
+
+from option import Option, Some
+
+from variables.Config import Config
+
+if sys.version_info >= (3, 11):
+    from typing import TYPE_CHECKING
+else:
+    from typing_extensions import TYPE_CHECKING
+if TYPE_CHECKING:
+    from classes.PlatformBase import PlatformBase
+
+
+@dataclass
+class DomainNode:
+    children: dict[str, DomainNode] = field(default_factory=dict)
+    platform: str | type[PlatformBase] | None = None
+
+
+class PlatformRegistry:
+    """Domain -> platform plugin. Domains are stored label by label from the right (net -> furaffinity -> www) so a
+    lookup costs one step per label and subdomains fall back to their parent. Plugins are given as
+    "module.path:ClassName" and only imported the first time one of their domains is matched."""
+
+    def __init__(self) -> None:
+        self.__root = DomainNode()
+        self.__config_registered = False
+
+    def register(self, platform: str | type[PlatformBase], domains: list[str]) -> None:
+        """Make `platform` handle `domains` and all of their subdomains"""
+        for domain in domains:
+            node = self.__root
+            for label in reversed(domain.lower().strip(".").split(".")):
+                node = node.children.setdefault(label, DomainNode())
+            node.platform = platform
+
+    def __load(self, node: DomainNode) -> type[PlatformBase]:
+        if isinstance(node.platform, str):
+            module, _, name = node.platform.partition(":")
+            node.platform = getattr(importlib.import_module(module), name)
+        return node.platform  # type: ignore
+
+    def match(self, domain: str) -> Option[type[PlatformBase]]:
+        """Platform of the longest registered suffix of `domain`"""
+        if not self.__config_registered:
+            self.__config_registered = True
+            for platform, domains in Config.PLATFORM_PLUGINS.items():
+                self.register(platform, domains)
+
+        node, found = self.__root, None
+        for label in reversed(domain.lower().strip(".").split(".")):
+            if (node := node.children.get(label)) is None:  # type: ignore
+                break
+            if node.platform is not None:
+                found = node
+        return Option.NONE() if found is None else Some(self.__load(found))  # type: ignore
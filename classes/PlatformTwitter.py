@@ -4,6 +4,7 @@ import re
 import sys
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from html import unescape
+from typing import Callable
 
 from option import Option, Some
 from selenium.webdriver.common.by import By
@@ -26,8 +27,10 @@ class PlatformTwitter(PlatformBase):
         self.title = "𝕏"
         self.post = "post"
         self.__driver = browser.driver
+        self.__open = browser.open
         self.__get_inner_html = browser.get_inner_html
         self.__get_elem = browser.get_elem
+        self.__get_elems = browser.get_elems
 
     def has_the_pattern(self, url: str) -> Option[str]:
         """Check if the provided url contains the pattern /<username>/status/<tweet_id>"""
@@ -36,9 +39,31 @@ class PlatformTwitter(PlatformBase):
             return Some(f"https://twitter.com/{username}/status/{tweet_id}")
         return Option.NONE()  # type: ignore
 
+    def list_posts(self, url: str, is_known: Callable[[str], bool]) -> Option[list[str]]:
+        """The user's own posts on the first screen of their /<user>/media timeline (a profile url works too)"""
+        if not (match := re.match(r".*(?:twitter|x)\.com\/([a-zA-Z0-9_]{1,15})(?:\/media)?\/?(?:[?#].*)?$", url)):
+            return Option.NONE()  # type: ignore
+        user = match.group(1)
+        self.__open(f"https://twitter.com/{user}/media")
+
+        posts: list[str] = []
+        for tweet in self.__get_elems(self.__driver, ".tweet"):
+            links = tweet.find_elements(By.CSS_SELECTOR, "a[href*='/status/']")  # type: ignore
+            href = (links[0].get_attribute("href") or "") if links else ""  # type: ignore
+            if (post := self.has_the_pattern(href)).is_none:
+                continue
+            # the pinned post isn't the newest and retweets aren't theirs, so skip rather than stop
+            if post.value.split("/")[3].casefold() != user.casefold() or post.value in posts or is_known(post.value):
+                continue
+            posts.append(post.value)
+        return Some(posts)
+
+    def username_url(self, handle: str) -> Option[str]:
+        return Some(f"https://twitter.com/{handle}")
+
     def get_username(self, handle: str) -> Option[str]:
         """Return (is_handle_valid: bool, username: str)"""
-        self.__driver.get(f"https://twitter.com/{handle}")
+        self.__open(self.username_url(handle).value)
         if self.__get_inner_html(self.__driver, "#loading-box-error") != "":
             return Option.NONE()  # type: ignore
         if (username := self.__get_inner_html(self.__driver, "#profile-name")) == "":
@@ -52,6 +77,11 @@ class PlatformTwitter(PlatformBase):
         username = re.sub(r"<img.*?alt=\"(.*?)\".*?>", r"\1", username)
         return unescape(username)
 
+    def __tweet_html(self, tweet: WebElement, css_selector: str) -> str:
+        """innerHTML of an element of an already rendered tweet, "" if it doesn't have one"""
+        elements = tweet.find_elements(By.CSS_SELECTOR, css_selector)  # type: ignore
+        return (elements[0].get_attribute("innerHTML") or "") if elements else ""  # type: ignore
+
     def __scrape_media(self, tweet: WebElement) -> tuple[str, list[str]]:
         """Return (content_type: str, content_list: list[str])"""
         media: list[str] = []
@@ -126,8 +156,54 @@ class PlatformTwitter(PlatformBase):
 
     # endregion
 
+    def scrape_thread(self, input_url: str) -> Option[Post]:
+        """The post plus the author's replies to themself right above and below it on the conversation page, as one
+        post with all their media"""
+        if (post_ := self.scrape(input_url)).is_none:
+            return post_
+
+        post = post_.value
+        # `scrape` already waited for the main tweet and read it, the replies around it are there by now, and a
+        # conversation without any doesn't wait for them. The author's own replies come first
+        tweets = self.__get_elems(self.__driver, ".tweet, .tweet-main", required=False)
+        mains = [i for i, tweet in enumerate(tweets) if "tweet-main" in (tweet.get_attribute("class") or "")]
+        if not mains:
+            return Some(post)
+
+        def by_author(tweet: WebElement) -> bool:
+            return self.__tweet_html(tweet, ".tweet-header-handle").replace("@", "").strip() == post.handle
+
+        main = start = mains[0]
+        end = main + 1
+        while start > 0 and by_author(tweets[start - 1]):
+            start -= 1
+        while end < len(tweets) and by_author(tweets[end]):
+            end += 1
+
+        contents: list[str] = []
+        media: list[str] = []
+        for index in range(start, end):
+            if index == main:
+                contents.append(post.content)
+                media += post.media
+                continue
+            contents.append(self.__process_content(self.__tweet_html(tweets[index], ".tweet-body-text")))
+            media_type, tweet_media = self.__scrape_media(tweets[index])
+            # an album is either photos or videos, the main tweet's kind wins
+            if tweet_media and media_type == (post.media_type or media_type):
+                post.media_type = media_type
+                media += tweet_media
+
+        post.media = media
+        post.content = "\n\n".join(content for content in contents if content)
+        links = self.__process_links(post.content)
+        post.mention_link = links["mentions"]
+        post.hashtag_link = links["hashtags"]
+        post.just_links = links["just_links"]
+        return Some(post)
+
     def scrape(self, input_url: str) -> Option[Post]:
-        self.__driver.get(self.has_the_pattern(input_url).value)
+        self.__open(self.has_the_pattern(input_url).value)
 
         render_timeout: float = 1.2
         if (tweet_ := self.__get_elem(self.__driver, ".tweet-main")).is_none:
@@ -136,14 +212,15 @@ class PlatformTwitter(PlatformBase):
 
         url = self.has_the_pattern(input_url).value
         pfp = tweet.find_element(By.CSS_SELECTOR, ".tweet-avatar").get_attribute("src") or ""  # type: ignore
-        handle = self.__get_inner_html(tweet, ".tweet-header-handle", render_timeout).replace("@", "")
+        if not (handle := self.__get_inner_html(tweet, ".tweet-header-handle", render_timeout).replace("@", "")):
+            return Option.NONE()  # type: ignore
         username = self.__cleanup_username(self.__get_inner_html(tweet, ".tweet-header-name", render_timeout))
 
         content = self.__process_content(self.__get_inner_html(tweet, ".tweet-body-text", render_timeout))
         media_type, media = self.__scrape_media(tweet)
         date = (
             ""
-            if (date_ := self.__get_elem(tweet, ".tweet-date")).is_none
+            if (date_ := self.__get_elem(tweet, ".tweet-date", required=False)).is_none
             else date_.value.get_attribute("title") or ""  # type: ignore
         )
 
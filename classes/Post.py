@@ -1,7 +1,14 @@
-from dataclasses import dataclass, field
+from __future__ import annotations
 
+import sys
+import zlib
+from dataclasses import dataclass, field, fields
+from typing import Any
 
-@dataclass
+from option import Option, Some
+
+
+@dataclass(slots=True)
 class Post:
     url: str = ""
 
@@ -26,6 +33,37 @@ class Post:
     hashtag_link: list[tuple[str, str]] = field(default_factory=list)
     just_links: list[tuple[str, str]] = field(default_factory=list)
 
+    def __post_init__(self) -> None:
+        # the same accounts, avatars and hashtags come back post after post, keep one copy of each
+        self.profile_picture = sys.intern(self.profile_picture)
+        self.handle = sys.intern(self.handle)
+        self.username = sys.intern(self.username)
+        self.media_type = sys.intern(self.media_type)
+        self.rating = sys.intern(self.rating)
+        self.mention_link = [(sys.intern(text), sys.intern(url)) for text, url in self.mention_link]
+        self.hashtag_link = [(sys.intern(text), sys.intern(url)) for text, url in self.hashtag_link]
+
+    def to_row(self) -> list[Any]:
+        """`POST_ROW_VERSION` then the fields in order, without their names: one JSON array per post in a JSONL file,
+        or a cheap pickle to send to another process"""
+        return [POST_ROW_VERSION] + [getattr(self, name) for name in POST_FIELDS]
+
+    @classmethod
+    def from_row(cls, row: list[Any] | dict[str, Any]) -> Option[Post]:
+        """Inverse of `to_row`, also takes the field-name dicts older journals were written with. NONE if the row was
+        written with other fields than the current ones, rather than a post with its values shifted"""
+        try:
+            if isinstance(row, dict):
+                post = cls(**row)
+            elif not row or row[0] != POST_ROW_VERSION:
+                return Option.NONE()  # type: ignore
+            else:
+                post = cls(*row[1:])
+        except (TypeError, ValueError):
+            return Option.NONE()  # type: ignore
+        post.just_links = [(text, url) for text, url in post.just_links]  # JSON has no tuples
+        return Some(post)
+
     @property
     def dict(self) -> dict[str, str | dict[str, str | int | list[str] | list[tuple[str, str]]] | list[str]]:
         return {
@@ -43,3 +81,8 @@ class Post:
                 "just_links": self.just_links,
             },
         }
+
+
+POST_FIELDS = tuple(field_.name for field_ in fields(Post))
+# changes whenever a field is added, removed, renamed or moved
+POST_ROW_VERSION = zlib.crc32(" ".join(POST_FIELDS).encode())
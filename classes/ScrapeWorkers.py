@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import Any
+
+from option import Option
+
+from classes.Browser import Browser
+from classes.Post import Post
+from helpers.match_host import match_host
+from variables.Config import Config
+
+# Profile files that are either locked by a running browser or just caches, no point in cloning them
+PROFILE_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "*.lock", "LOCK", "Cache", "Code Cache", "GPUCache", "Service Worker", "Crashpad"
+)
+
+# one browser per worker process
+_browser: Browser | None = None
+
+
+def _init_worker(config: dict[str, Any], indices: multiprocessing.Queue[int]) -> None:  # type: ignore
+    """Runs once in every worker process: apply the parent's config, clone the profile, start a browser"""
+    global _browser
+    for key, value in config.items():
+        setattr(Config, key, value)
+
+    user_data_dir = f"{Config.USER_DATA_DIR}_worker{indices.get()}"
+    if os.path.isdir(Config.USER_DATA_DIR):
+        shutil.copytree(Config.USER_DATA_DIR, user_data_dir, ignore=PROFILE_IGNORE, dirs_exist_ok=True)
+
+    _browser = Browser(user_data_dir)
+    Finalize(None, lambda: _browser.driver.quit(), exitpriority=10)  # type: ignore
+
+
+def _scrape(url: str) -> list[Any] | None:
+    """Runs in a worker process, returns the scraped post as a row so it's cheap to send back"""
+    assert _browser is not None
+    _browser.recycle_if_needed()
+    if (platform := match_host(url, _browser)).is_err:
+        return None
+    if (post := platform.unwrap().scrape(url)).is_none:
+        return None
+    return post.unwrap().to_row()
+
+
+class ScrapeWorkers:
+    """Scrape posts in parallel, each worker process owns a browser on its own copy of `Config.USER_DATA_DIR`"""
+
+    def __init__(self, processes: int = 0) -> None:
+        processes = processes or Config.SCRAPE_PROCESSES
+        config = {key: value for key, value in vars(Config).items() if not key.startswith("__")}
+        indices: multiprocessing.Queue[int] = multiprocessing.Queue()  # type: ignore
+        for index in range(processes):
+            indices.put(index)
+
+        self.__executor = ProcessPoolExecutor(processes, initializer=_init_worker, initargs=(config, indices))
+        self.__futures: dict[str, Future[list[Any] | None]] = {}
+
+    def submit(self, url: str) -> None:
+        """Queue a canonical post url, does nothing if it's already queued"""
+        if url not in self.__futures:
+            self.__futures[url] = self.__executor.submit(_scrape, url)
+
+    def get(self, url: str) -> Option[Post]:
+        """Wait for a submitted url to be scraped"""
+        self.submit(url)
+        try:
+            post = self.__futures.pop(url).result()
+        except Exception as e:
+            print(f"Scrape worker error: {e}")
+            return Option.NONE()  # type: ignore
+        return Option.NONE() if post is None else Post.from_row(post)  # type: ignore
+
+    def close(self) -> None:
+        self.__executor.shutdown(wait=True, cancel_futures=True)
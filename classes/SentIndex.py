@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from option import Option, Some
+
+from variables.Config import Config
+
+
+@dataclass
+class SentRecord:
+    url: str
+    message_ids: list[int]
+    sent_at: float
+
+
+class BloomFilter:
+    """Set membership in a fixed-size bit array: never a false negative, ~0.1% false positives up to `capacity`"""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.__bits = capacity * 15
+        self.__hashes = 7
+        self.__array = bytearray(self.__bits // 8 + 1)
+
+    def __positions(self, item: str) -> list[int]:
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.__bits for i in range(self.__hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self.__positions(item):
+            self.__array[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.__array[position >> 3] & (1 << (position & 7)) for position in self.__positions(item))
+
+
+class SentIndex:
+    """Canonical urls of posts already sent to Telegram, with the ids of the messages they became. Stored in SQLite,
+    with a Bloom filter in front so a url that was never sent is answered from memory."""
+
+    def __init__(self, path: str = "") -> None:
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path or Config.SENT_INDEX_FILE, check_same_thread=False)
+        self.__db.execute("CREATE TABLE IF NOT EXISTS sent (url TEXT PRIMARY KEY, message_ids TEXT, sent_at REAL)")
+        self.__db.commit()
+        self.__rebuild_filter()
+
+    def __rebuild_filter(self) -> None:
+        count: int = self.__db.execute("SELECT COUNT(*) FROM sent").fetchone()[0]
+        self.__filter = BloomFilter(max(count * 2, 10_000))
+        self.__count = count
+        for (url,) in self.__db.execute("SELECT url FROM sent"):
+            self.__filter.add(url)
+
+    def get(self, url: str) -> Option[SentRecord]:
+        """The record of a sent url, if it was sent"""
+        if url not in self.__filter:
+            return Option.NONE()  # type: ignore
+        with self.__lock:
+            row = self.__db.execute("SELECT url, message_ids, sent_at FROM sent WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return Option.NONE()  # type: ignore
+        return Some(SentRecord(url=row[0], message_ids=json.loads(row[1]), sent_at=row[2]))
+
+    def __contains__(self, url: str) -> bool:
+        return self.get(url).is_some
+
+    def add(self, url: str, message_ids: list[int]) -> None:
+        with self.__lock:
+            self.__db.execute(
+                "INSERT OR REPLACE INTO sent (url, message_ids, sent_at) VALUES (?, ?, ?)",
+                (url, json.dumps(message_ids), time.time()),
+            )
+            self.__db.commit()
+            self.__filter.add(url)
+            self.__count += 1
+            if self.__count > self.__filter.capacity:
+                self.__rebuild_filter()
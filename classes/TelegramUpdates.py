@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable
+
+import requests
+from option import Err, Ok, Result
+
+from variables.Config import Config
+
+Update = dict[str, Any]
+Handler = Callable[[Update], None]
+
+
+class TelegramUpdates:
+    """Long-polling `getUpdates` consumer
+
+    Each `getUpdates` call is held open by Telegram for up to `Config.LONG_POLL_TIMEOUT` seconds, so an idle bot
+    costs one open connection instead of one request per second. Updates are acknowledged by advancing the offset,
+    every response is parsed once and each message is dispatched to the matching handler.
+    """
+
+    def __init__(self, allowed_updates: list[str] | None = None, skip_pending: bool = False) -> None:
+        self.__api = f"https://api.telegram.org/bot{Config.BOT_API_KEY}"
+        self.__session = requests.Session()
+        self.__allowed_updates = allowed_updates or ["message"]
+        self.__offset = 0
+        self.__stopped = False
+        self.__commands: dict[str, Handler] = {}
+        self.__message_handlers: list[Handler] = []
+
+        if skip_pending:
+            self.__skip_pending()
+
+    # region: helper functions
+
+    def __skip_pending(self) -> None:
+        """Acknowledge everything that arrived before the consumer started"""
+        if (updates := self.__get_updates(offset=-1, timeout=0)).is_ok and updates.unwrap():
+            self.__offset = updates.unwrap()[-1]["update_id"] + 1
+
+    def __get_updates(self, offset: int, timeout: int) -> Result[list[Update], str]:
+        try:
+            response = self.__session.post(
+                f"{self.__api}/getUpdates",
+                json={"offset": offset, "timeout": timeout, "allowed_updates": self.__allowed_updates},
+                timeout=timeout + 10,
+            )
+            data = response.json()
+        except Exception as e:
+            return Err(f"getUpdates failed: {e}")
+        if not data.get("ok"):
+            return Err(f"getUpdates failed: {response.status_code} {data.get('description', response.reason)}")
+        return Ok(data["result"])
+
+    def __dispatch(self, update: Update) -> None:
+        message: Update | None = update.get("message") or update.get("channel_post")
+        if message is None:
+            return
+        text: str = message.get("text", "").strip()
+        if text.startswith("/"):
+            # "/cmd@bot_name args" -> "/cmd"
+            command = text.split(" ")[0].split("@")[0].lower()
+            if command in self.__commands:
+                self.__commands[command](message)
+                return
+        for handler in self.__message_handlers:
+            handler(message)
+
+    # endregion
+
+    def on_command(self, command: str, handler: Handler) -> None:
+        """Call `handler(message)` for messages starting with `command`, e.g. "/id" """
+        self.__commands[command.lower()] = handler
+
+    def on_message(self, handler: Handler) -> None:
+        """Call `handler(message)` for every message that isn't a registered command"""
+        self.__message_handlers.append(handler)
+
+    def poll(self) -> Result[int, str]:
+        """Long-poll once, dispatch the received updates and acknowledge them, return the number of updates"""
+        if (updates := self.__get_updates(self.__offset, Config.LONG_POLL_TIMEOUT)).is_err:
+            return Err(updates.unwrap_err())
+        for update in updates.unwrap():
+            self.__offset = update["update_id"] + 1
+            self.__dispatch(update)
+            if self.__stopped:
+                break
+        return Ok(len(updates.unwrap()))
+
+    def run(self) -> None:
+        """Poll until `stop()` is called"""
+        self.__stopped = False
+        retry_delay = 1
+        while not self.__stopped:
+            if (res := self.poll()).is_err:
+                print(res.unwrap_err())
+                time.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 60)
+                continue
+            retry_delay = 1
+
+    def stop(self) -> None:
+        self.__stopped = True
+
+    def send_message(self, chat_id: int | str, text: str, **kwargs: Any) -> Result[Update, str]:
+        """Send a plain `sendMessage`, extra `kwargs` are passed to the API as-is"""
+        try:
+            response = self.__session.post(
+                f"{self.__api}/sendMessage", json={"chat_id": chat_id, "text": text, **kwargs}, timeout=30
+            )
+            data = response.json()
+        except Exception as e:
+            return Err(f"sendMessage failed: {e}")
+        if not data.get("ok"):
+            return Err(f"sendMessage failed: {response.status_code} {data.get('description', response.reason)}")
+        return Ok(data["result"])
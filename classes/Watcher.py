@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+from dataclasses import asdict, dataclass
+
+import requests
+
+from classes.NewArtist import ArtistInfoData
+from helpers.find_main_handle import find_main_handle
+from helpers.invalid_sm_links import HEADERS
+from helpers.match_host import match_host
+from helpers.print_sign import print_sign
+from variables.Config import Config
+from variables.Message import Msg, MsgErr
+
+if sys.version_info >= (3, 11):
+    from typing import TYPE_CHECKING
+else:
+    from typing_extensions import TYPE_CHECKING
+if TYPE_CHECKING:
+    from classes.Browser import Browser
+
+# an artist's social link -> the listing of their posts that gets polled
+LISTINGS = {
+    r"furaffinity\.net\/user\/([^\/?#]+)": "https://www.furaffinity.net/gallery/{}/",
+    r"(?:twitter|x)\.com\/([a-zA-Z0-9_]{1,15})(?:[\/?#]|$)": "https://twitter.com/{}/media",
+}
+
+
+def post_id(url: str) -> int:
+    """FA submission ids and tweet ids both only grow, the newest post has the biggest one"""
+    return int(match.group(1)) if (match := re.search(r"(\d+)\/?$", url)) else 0
+
+
+@dataclass
+class ListingState:
+    last_id: int = 0  # newest post seen in the listing, 0 if it was never polled
+    etag: str = ""
+    last_modified: str = ""
+    idle_polls: int = 0  # polls in a row a listing only the browser could read had nothing new
+    skip_polls: int = 0  # polls left before it's loaded again
+
+
+class Watcher:
+    """Polls the galleries of the artists in `watch_artists` for posts newer than the last one seen there. FA
+    galleries (and 𝕏 media timelines, through the RSS of `watch_x_rss_host`) are asked for with a conditional request
+    first, so one that didn't change costs a 304 and one that did is read from that response. The browser is only
+    needed when it can't be (e.g. mature galleries when logged out), and a listing it had to load for nothing is
+    loaded less and less often"""
+
+    def __init__(
+        self,
+        artists_info: dict[str, ArtistInfoData],
+        artists_alt_handles: dict[str, set[str]],
+        browser: Browser,
+        path: str = "",
+    ) -> None:
+        self.__path = path or Config.WATCH_STATE_FILE
+        self.__artists_info = artists_info
+        self.__artists_alt_handles = artists_alt_handles
+        self.__browser = browser
+        self.__states: dict[str, ListingState] = {}  # key: listing url
+        self.__polled: dict[str, list[str]] = {}  # key: listing url, value: posts found there by the last poll
+        if os.path.isfile(self.__path):
+            with open(self.__path, mode="r", encoding="utf-8") as f:
+                self.__states = {url: ListingState(**state) for url, state in json.load(f).items()}
+
+    # region: helper functions
+
+    @staticmethod
+    def __feed(listing: str) -> tuple[str, re.Pattern[str], str] | None:
+        """The version of a listing that can be asked for conditionally without the browser: its url, the pattern of
+        the post ids in it and the url of a post by id. None if there isn't one"""
+        if "furaffinity.net" in listing:
+            return listing, re.compile(r"id=\"sid-(\d+)\""), "https://www.furaffinity.net/view/{}"
+        if Config.WATCH_X_RSS_HOST and (match := re.search(r"twitter\.com\/([^\/]+)\/media", listing)):
+            user = match.group(1)
+            return (
+                f"https://{Config.WATCH_X_RSS_HOST}/{user}/media/rss",
+                re.compile(rf"\/{user}\/status\/(\d+)", re.IGNORECASE),  # retweets link to someone else's
+                f"https://twitter.com/{user}/status/{{}}",
+            )
+        return None
+
+    def __conditional(self, url: str, id_pattern: re.Pattern[str], state: ListingState) -> list[int] | None:
+        """Ids of the posts in a feed or the first page of a listing, newest first, [] if it didn't change since the
+        last poll, None if it can't be read this way"""
+        headers = dict(HEADERS)
+        if state.etag:
+            headers["If-None-Match"] = state.etag
+        if state.last_modified:
+            headers["If-Modified-Since"] = state.last_modified
+        try:
+            res = requests.get(url, headers=headers, timeout=Config.WATCH_REQUEST_TIMEOUT)
+        except requests.RequestException:
+            return None
+        if res.status_code == 304:
+            return []
+        if res.status_code != 200:
+            return None
+        state.etag = res.headers.get("ETag", "")
+        state.last_modified = res.headers.get("Last-Modified", "")
+        # a gallery hidden from guests has no submissions in it
+        return list(dict.fromkeys(int(id_) for id_ in id_pattern.findall(res.text))) or None
+
+    def __polling(self, listing: str, state: ListingState) -> tuple[list[str], bool]:
+        """Canonical urls of the posts in a listing newer than its last seen one, newest first, and whether the
+        browser had to load it"""
+        if (feed := self.__feed(listing)) is not None and (ids := self.__conditional(*feed[:2], state)) is not None:
+            if not ids or max(ids) <= state.last_id:
+                return [], False
+            # everything new is in it, no need to go through the rest
+            if state.last_id == 0 or min(ids) <= state.last_id:
+                return [feed[2].format(id_) for id_ in ids if id_ > state.last_id], False
+
+        if (platform := match_host(listing, self.__browser)).is_err:
+            return [], False
+        if (posts := platform.unwrap().list_posts(listing, lambda url: 0 < post_id(url) <= state.last_id)).is_none:
+            return [], True
+        return [url for url in posts.value if post_id(url) > state.last_id], True
+
+    # endregion
+
+    def listings(self) -> list[str]:
+        """Listing urls of the watched artists, from the social links in the DB that have one"""
+        listings: list[str] = []
+        for handle in Config.WATCH_ARTISTS:
+            if (main_handle := find_main_handle(handle, self.__artists_alt_handles, self.__artists_info)).is_none:
+                print_sign(MsgErr.WATCH_UNKNOWN_ARTIST.format(handle))
+                continue
+            for link in self.__artists_info[main_handle.value].social_media.values():
+                for pattern, listing in LISTINGS.items():
+                    if match := re.search(pattern, link):
+                        listings.append(listing.format(match.group(1)))
+        return list(dict.fromkeys(listings))
+
+    def poll(self) -> list[str]:
+        """Canonical urls of the new posts of every listing, oldest first. A listing polled for the first time only
+        marks where to start from"""
+        new_posts: list[str] = []
+        for listing in self.listings():
+            state = self.__states.setdefault(listing, ListingState())
+            if state.skip_polls > 0:
+                state.skip_polls -= 1
+                continue
+            posts, loaded = self.__polling(listing, state)
+            if loaded and not posts:
+                # 1, 3, 7... polls are skipped, up to `watch_max_backoff`
+                state.idle_polls += 1
+                state.skip_polls = min(2**state.idle_polls - 1, Config.WATCH_MAX_BACKOFF)
+            elif posts:
+                state.idle_polls = 0
+            if not posts:
+                continue
+            self.__polled[listing] = posts
+            if state.last_id == 0:
+                print_sign(Msg.WATCH_STARTING_POINT.format(listing))
+                continue
+            new_posts.extend(reversed(posts))
+        return new_posts
+
+    def commit(self, handled: list[str]) -> None:
+        """Remember the posts of the last poll as seen up to the first one that wasn't handled (sent, dropped or
+        journaled), so that one and the ones after it are polled again"""
+        for listing, posts in self.__polled.items():
+            state = self.__states[listing]
+            # the first poll of a listing didn't hand anything over
+            failed = [post_id(url) for url in posts if url not in handled] if state.last_id else []
+            state.last_id = max(state.last_id, min(failed) - 1 if failed else max(post_id(url) for url in posts))
+        self.__polled.clear()
+        with open(f"{self.__path}.tmp", mode="w", encoding="utf-8") as f:
+            json.dump({url: asdict(state) for url, state in self.__states.items()}, f, indent=4)
+        os.replace(f"{self.__path}.tmp", self.__path)
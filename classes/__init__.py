@@ -1,16 +1,36 @@
 from classes.Browser import Browser
+from classes.Composer import Composer
+from classes.Daemon import Daemon
+from classes.FileIdCache import FileIdCache
+from classes.ImageHashIndex import ImageHashIndex
+from classes.ImagePreprocessor import ImagePreprocessor
+from classes.Journal import Journal
+from classes.LinkCache import LinkCache
 from classes.NewArtist import ArtistInfoData, NewArtist
 from classes.PlatformBase import PlatformBase
-from classes.PlatformFA import PlatformFA
-from classes.PlatformTwitter import PlatformTwitter
+from classes.PlatformRegistry import PlatformRegistry
 from classes.Post import Post
+from classes.ScrapeWorkers import ScrapeWorkers
+from classes.SentIndex import SentIndex
+from classes.TelegramUpdates import TelegramUpdates
+from classes.Watcher import Watcher
 
 __all__ = [
+    "FileIdCache",
+    "ImageHashIndex",
+    "ImagePreprocessor",
+    "Journal",
+    "LinkCache",
     "NewArtist",
     "ArtistInfoData",
     "Post",
     "Browser",
+    "Composer",
     "PlatformBase",
-    "PlatformFA",
-    "PlatformTwitter",
+    "PlatformRegistry",
+    "TelegramUpdates",
+    "Daemon",
+    "ScrapeWorkers",
+    "SentIndex",
+    "Watcher",
 ]
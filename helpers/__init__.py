@@ -1,16 +1,19 @@
 from helpers.artists_info_load_save import artists_info_load, artists_info_save
 from helpers.find_main_handle import find_main_handle
 from helpers.insensitive_match import insensitive_match  # type: ignore
-from helpers.invalid_sm_links import check_invalid_links, handle_invalid_links
+from helpers.invalid_sm_links import audit_links, check_invalid_links, handle_invalid_links
+from helpers.load_config import load_config, reload_config
 from helpers.match_host import match_host
 from helpers.md_format import md_format
 from helpers.norm import norm
 from helpers.overwrite_sm_name import overwrite_sm_name
 from helpers.print_sign import print_sign
+from helpers.reparse_alt_handles import reparse_alt_handles
 from helpers.send_telegram_message import send_telegram_message
 from helpers.telegram_listen import telegram_listen
 
 __all__ = [
+    "audit_links",
     "check_invalid_links",
     "handle_invalid_links",
     "find_main_handle",
@@ -24,4 +27,7 @@ __all__ = [
     "telegram_listen",
     "artists_info_load",
     "artists_info_save",
+    "reparse_alt_handles",
+    "load_config",
+    "reload_config",
 ]
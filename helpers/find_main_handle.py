@@ -4,12 +4,20 @@ from classes.NewArtist import ArtistInfoData
 
 
 def find_main_handle(
-    artist_handle: str, artists_alt_handles: dict[str, set[str]], artists_info: dict[str, ArtistInfoData]
+    artist_handle: str,
+    artists_alt_handles: dict[str, set[str]],
+    artists_info: dict[str, ArtistInfoData],
+    unambiguous: bool = False,
 ) -> Option[str]:
-    for handle, alt_handles in artists_alt_handles.items():
-        if artist_handle.lower() in [handle.lower()] + [alt_handle.lower() for alt_handle in alt_handles]:
-            return Some(handle)
-    for item in artists_info.keys():
-        if artist_handle.lower() == item.lower():
-            return Some(item)
-    return Option.NONE()  # type: ignore
+    """The main handle of the artist a handle belongs to. With `unambiguous`, NONE if it belongs to several artists
+    (e.g. an alt handle listed under two of them) instead of the first one found"""
+    lowered = artist_handle.lower()
+    matches = [
+        handle
+        for handle, alt_handles in artists_alt_handles.items()
+        if lowered in [handle.lower()] + [alt_handle.lower() for alt_handle in alt_handles]
+    ]
+    matches += [item for item in artists_info.keys() if lowered == item.lower()]
+    if not matches or (unambiguous and len(set(matches)) > 1):
+        return Option.NONE()  # type: ignore
+    return Some(matches[0])
@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import json
 import re
 import sys
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures import as_completed
+from typing import Any, Callable
+from urllib.parse import urlparse
 
 import requests
 from option import Option, Some
+from selenium.webdriver.common.by import By
 
+from classes.LinkCache import LinkCache
 from variables.Colors import Colors
 from variables.Config import Config
 
@@ -17,12 +25,21 @@ else:
     from typing_extensions import TYPE_CHECKING
 if TYPE_CHECKING:
     from classes.Browser import Browser
+    from classes.NewArtist import ArtistInfoData
+
+HEADERS = {"User-Agent": "Mozilla/5.0"}
+PIXIV_FOLLOW = '[data-click-label="follow"]'
+# statuses of links that couldn't be reached, which says nothing about whether they're valid
+TIMED_OUT = "timeout"
+HOST_SKIPPED = "host timing out, skipped"
+
+__valid_links: LinkCache | None = None
 
 
 def __print_link(name: str, link: str, status: str) -> None:
     """Print the link with a status"""
     match status:
-        case _ if status.startswith("2") or status == "valid":
+        case _ if status.startswith("2") or status in ("valid", "cached"):
             status = Colors.GREEN + status + Colors.END
         case _ if status == "invalid":
             status = Colors.RED + status + Colors.END
@@ -32,106 +49,225 @@ def __print_link(name: str, link: str, status: str) -> None:
     print(f"- {name} ({link}): {status}")
 
 
-def __check_request(urL: str) -> bool:
-    """Check if the provided url is valid using requests"""
-    try:
-        response = requests.get(urL)
-    except Exception as e:
-        print(f"Exception: {e}")
-        return False
-    else:
-        return str(response.status_code)[0] == "2"
-
-
-def __check_selenium_uname_in_title(url: str, uname: str, browser: Browser) -> bool:
-    """Check if the website's title contains the artist's username"""
-    browser.driver.get(url)
-    valid = False
-    timer = time.time()
-    while not valid:
+def __link_cache() -> LinkCache:
+    global __valid_links
+    if __valid_links is None:
+        __valid_links = LinkCache()
+    return __valid_links
+
+
+def __normalized(name: str, link: str) -> str:
+    """The link with a scheme, "" if it's in `Config.IGNORE_LINK_VALIDATION`"""
+    for ignored_link in Config.IGNORE_LINK_VALIDATION:
+        if ignored_link in link:
+            __print_link(name, link, "ignored")
+            return ""
+    return link if link.startswith("http") else f"https://{link}"
+
+
+# host -> (consecutive timeouts/connection errors, time of the last one)
+__breakers: dict[str, tuple[int, float]] = {}
+__breakers_lock = threading.Lock()
+
+
+def __breaker_is_open(host: str, breakers: dict[str, tuple[int, float]]) -> bool:
+    """A host that keeps timing out is skipped until `Config.CIRCUIT_BREAKER_COOLDOWN` passes, then tried once more"""
+    with __breakers_lock:
+        failures, last_failure = breakers.get(host, (0, 0.0))
+    return failures >= Config.CIRCUIT_BREAKER_FAILURES and time.time() - last_failure < Config.CIRCUIT_BREAKER_COOLDOWN
+
+
+def __breaker_record(host: str, reachable: bool, breakers: dict[str, tuple[int, float]]) -> None:
+    with __breakers_lock:
+        if reachable:
+            breakers.pop(host, None)
+        else:
+            breakers[host] = (breakers.get(host, (0, 0.0))[0] + 1, time.time())
+
+
+def __check_request(
+    url: str, deadline: float, breakers: dict[str, tuple[int, float]] | None = None
+) -> tuple[bool, str]:
+    """Check if the provided url is valid using requests, return (is_valid, status).
+    HEAD first, then a GET that's closed as soon as the headers arrive, never past `deadline`. The hosts timing out
+    are tracked in `breakers`, the ones shared by the interactive checks by default"""
+    breakers = __breakers if breakers is None else breakers
+    host = urlparse(url).hostname or ""
+    if __breaker_is_open(host, breakers):
+        return False, HOST_SKIPPED
+
+    response: requests.Response | None = None
+    for method in ("HEAD", "GET"):
+        if (timeout := min(Config.LINK_VALIDATION_TIMEOUT, deadline - time.time())) <= 0:
+            return False, TIMED_OUT
         try:
-            title = browser.get_inner_html(browser.driver, "title")
-        except:
-            continue
-        valid = uname.lower() in title.lower()
-        if time.time() - timer > Config.WAIT_ELEM_TIMEOUT:
-            break
-    return valid
+            response = requests.request(
+                method,
+                url,
+                headers={"User-Agent": "Mozilla/5.0", "Range": "bytes=0-0"} if method == "GET" else HEADERS,
+                timeout=timeout,
+                allow_redirects=True,
+                stream=True,
+            )
+            response.close()
+        except (requests.Timeout, requests.ConnectionError):
+            __breaker_record(host, False, breakers)
+            return False, TIMED_OUT
+        except Exception as e:
+            return False, f"exception: {e}"
+        __breaker_record(host, True, breakers)
+        if response.ok or response.status_code == 416:  # 416: the page exists, it just doesn't do ranges
+            return True, str(response.status_code)
+    return False, str(response.status_code) if response is not None else "invalid"
+
 
+def __parse_uname(link: str) -> str:
+    """Username in a link to a site whose page title contains it"""
+    for host in ("ko-fi.com", "subscribestar.adult", "skeb.jp", "picarto.tv", "linktr.ee"):
+        if host in link:
+            if (match := re.search(rf"(?<={re.escape(host)}\/)[^\/]+", link)) is not None:
+                return match.group(0)
+            return ""
+    return ""
 
-def __check_selenium_pixiv(url: str, browser: Browser) -> bool:
-    """Check if the pixiv page contains the follow button"""
-    browser.driver.get(url)
-    return browser.get_elem(browser.driver, '[data-click-label="follow"]').is_some
+
+def __check_selenium(links: dict[str, str], browser: Browser) -> dict[str, str]:
+    """Open every link in its own background tab at once, then poll the tabs until each one passes its check or
+    `Config.WAIT_ELEM_TIMEOUT` runs out. The browser's current tab is left alone. Return the links that failed"""
+    checks: dict[str, Callable[[], bool]] = {}
+    for name, link in links.items():
+        if "pixiv.net" in link:
+            # the pixiv page contains the follow button
+            checks[name] = lambda: len(browser.driver.find_elements(By.CSS_SELECTOR, PIXIV_FOLLOW)) > 0
+        elif uname := __parse_uname(link):
+            # the website's title contains the artist's username
+            checks[name] = lambda uname=uname: uname.lower() in (browser.driver.title or "").lower()
+        else:
+            __print_link(name, link, "cannot parse username from link")
+
+    tabs = {name: browser.open_tab(links[name]) for name in checks}
+    timer = time.time()
+    try:
+        while checks and time.time() - timer < Config.WAIT_ELEM_TIMEOUT:
+            for name in list(checks.keys()):
+                try:
+                    with browser.switched_to(tabs[name]):
+                        valid = checks[name]()
+                except:
+                    valid = False
+                if valid:
+                    __print_link(name, links[name], "valid")
+                    del checks[name]
+            time.sleep(0.2)
+    finally:
+        for handle in tabs.values():
+            browser.close_tab(handle)
+
+    for name in checks:
+        __print_link(name, links[name], "invalid")
+    return {name: link for name, link in links.items() if name in checks or name not in tabs}
 
 
 def check_invalid_links(_input_links: dict[str, str], browser: Browser) -> Option[dict[str, str]]:
     """Validate social media links and return invalid links"""
     links_to_check: dict[str, str] = {}
     for name, link in _input_links.items():
-        ignored = False
-        for ignored_link in Config.IGNORE_LINK_VALIDATION:
-            if ignored_link in link:
-                __print_link(name, link, "ignored")
-                ignored = True
-                break
-        if ignored:
+        if not (link := __normalized(name, link)):
+            continue
+        # found valid lately, by an audit or another post
+        if __link_cache().get(link).is_some:
+            __print_link(name, link, "cached")
             continue
-        if not link.startswith("http"):
-            link = f"https://{link}"
         links_to_check[name] = link
 
+    valid_links: dict[str, str] = {}  # key: url, value: status
     invalid_links: dict[str, str] = {}
-    with ThreadPoolExecutor() as executor:
-        futures = {executor.submit(__check_request, link): name for name, link in links_to_check.items()}
-        for future in as_completed(futures):
-            is_valid, url = future.result(), links_to_check[futures[future]]
+    deadline = time.time() + Config.LINK_VALIDATION_DEADLINE
+    executor = ThreadPoolExecutor()
+    futures = {executor.submit(__check_request, link, deadline): name for name, link in links_to_check.items()}
+    try:
+        for future in as_completed(futures, timeout=max(deadline - time.time(), 0)):
+            (is_valid, status), name = future.result(), futures[future]
+            __print_link(name, links_to_check[name], status)
             if not is_valid:
-                invalid_links[futures[future]] = url
+                invalid_links[name] = links_to_check[name]
             else:
-                __print_link(futures[future], url, "200")
+                valid_links[links_to_check[name]] = status
+    except FuturesTimeoutError:
+        for future, name in futures.items():
+            if not future.done():
+                __print_link(name, links_to_check[name], TIMED_OUT)
+                invalid_links[name] = links_to_check[name]
+    executor.shutdown(wait=False, cancel_futures=True)
 
     if invalid_links:
-        for name, link in zip(list(invalid_links.keys()).copy(), list(invalid_links.values()).copy()):
-            if "pixiv.net" in link:
-                if __check_selenium_pixiv(link, browser):
-                    print(f"- {name} ({Colors.CYAN}{link}{Colors.END}): {Colors.GREEN}valid{Colors.END}")
-                    del invalid_links[name]
-                    continue
-                else:
-                    print(f"- {name} ({Colors.CYAN}{link}{Colors.END}): {Colors.RED}invalid{Colors.END}")
-
-            uname: str = ""
-            match link:
-                case _ if "ko-fi.com" in link:
-                    if (match := re.search(r"(?<=ko-fi.com\/)[^\/]+", link)) is not None:
-                        uname = match.group(0)
-                case _ if "subscribestar.adult" in link:
-                    if (match := re.search(r"(?<=subscribestar.adult\/)[^\/]+", link)) is not None:
-                        uname = match.group(0)
-                case _ if "skeb.jp" in link:
-                    if (match := re.search(r"(?<=skeb.jp\/)[^\/]+", link)) is not None:
-                        uname = match.group(0)
-                case _ if "picarto.tv" in link:
-                    if (match := re.search(r"(?<=picarto.tv\/)[^\/]+", link)) is not None:
-                        uname = match.group(0)
-                case _ if "linktr.ee" in link:
-                    if (match := re.search(r"(?<=linktr.ee\/)[^\/]+", link)) is not None:
-                        uname = match.group(0)
-                case _:
-                    pass
+        still_invalid = __check_selenium(invalid_links, browser)
+        valid_links.update({link: "valid" for name, link in invalid_links.items() if name not in still_invalid})
+        invalid_links = still_invalid
+    __link_cache().add(valid_links)
 
-            if not uname:
-                __print_link(name, link, "cannot parse username from link")
-                continue
+    return Some(invalid_links) if invalid_links else Option.NONE()  # type: ignore
 
-            if __check_selenium_uname_in_title(link, uname, browser):
-                __print_link(name, link, "valid")
-                del invalid_links[name]
-            else:
-                __print_link(name, link, "invalid")
 
-    return Some(invalid_links) if invalid_links else Option.NONE()  # type: ignore
+def audit_links(artists_info: dict[str, ArtistInfoData], browser: Browser) -> dict[str, Any]:
+    """Validate the social links of every artist: each url once, at most `Config.AUDIT_PER_HOST` requests to a host at
+    a time, and the ones requests can't confirm in the browser a few tabs at a time. Links whose host couldn't be
+    reached are reported as unreachable rather than invalid. The valid ones go into the cache `check_invalid_links`
+    reads and the invalid ones out of it, the report is written to `Config.AUDIT_REPORT_FILE` and returned"""
+    used_by: dict[str, list[dict[str, str]]] = {}  # key: url
+    for handle, artist in artists_info.items():
+        for name, link in artist.social_media.items():
+            if link := __normalized(name, link):
+                used_by.setdefault(link, []).append({"artist": handle, "name": name})
+
+    hosts = {urlparse(url).hostname or "": threading.Semaphore(Config.AUDIT_PER_HOST) for url in used_by}
+    # a host that's down during the audit doesn't get skipped by the posts being checked meanwhile, nor the other way
+    breakers: dict[str, tuple[int, float]] = {}
+
+    def checking(url: str) -> tuple[bool, str]:
+        with hosts[urlparse(url).hostname or ""]:
+            return __check_request(url, time.time() + Config.LINK_VALIDATION_DEADLINE, breakers)
+
+    def label(url: str) -> str:
+        return f"{used_by[url][0]['artist']} {used_by[url][0]['name']}"
+
+    results: dict[str, tuple[bool, str]] = {}  # key: url, value: (is_valid, status)
+    with ThreadPoolExecutor(Config.AUDIT_WORKERS) as executor:
+        futures = {executor.submit(checking, url): url for url in used_by}
+        for future in as_completed(futures):
+            results[url := futures[future]] = future.result()
+            __print_link(label(url), url, results[url][1])
+
+    failed = [url for url, (is_valid, _) in results.items() if not is_valid]
+    tabs = max(Config.MAX_PREFETCH_TABS, 1)
+    for start in range(0, len(failed), tabs):
+        batch = {label(url): url for url in failed[start : start + tabs]}
+        still_invalid = __check_selenium(batch, browser)
+        results.update({url: (True, "valid") for name, url in batch.items() if name not in still_invalid})
+
+    outcomes = ["invalid", "unreachable", "valid"]
+    outcome = {
+        url: "valid" if is_valid else "unreachable" if status in (TIMED_OUT, HOST_SKIPPED) else "invalid"
+        for url, (is_valid, status) in results.items()
+    }
+    __link_cache().add({url: status for url, (is_valid, status) in results.items() if is_valid})
+    # one that was valid and is only unreachable for now stays cached until its TTL runs out
+    __link_cache().discard([url for url in results if outcome[url] == "invalid"])
+
+    report = {
+        "checked_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "links": len(results),
+        "invalid": sum(outcome[url] == "invalid" for url in results),
+        "unreachable": sum(outcome[url] == "unreachable" for url in results),
+        # invalid ones first, then unreachable
+        "results": [
+            {"url": url, "outcome": outcome[url], "status": status, "used_by": used_by[url]}
+            for url, (_, status) in sorted(results.items(), key=lambda result: outcomes.index(outcome[result[0]]))
+        ],
+    }
+    with open(Config.AUDIT_REPORT_FILE, mode="w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4, ensure_ascii=False)
+    return report
 
 
 def handle_invalid_links(links: dict[str, str], invalid_links: dict[str, str]) -> Option[str]:
@@ -152,8 +288,8 @@ def handle_invalid_links(links: dict[str, str], invalid_links: dict[str, str]) -
                     if not input_new_url:
                         print("Invalid parameters")
                         continue
-                    respond = requests.get(input_new_url, headers={"User-Agent": "Mozilla/5.0"})
-                    if not respond.ok:
+                    # a link that can't be reached is as good as invalid
+                    if not __check_request(input_new_url, time.time() + Config.LINK_VALIDATION_DEADLINE)[0]:
                         print("Invalid link")
                         continue
                     links[invalid_link_name] = input_new_url
@@ -164,7 +300,7 @@ def handle_invalid_links(links: dict[str, str], invalid_links: dict[str, str]) -
                         print("Invalid parameters")
                         continue
                     new_name, new_url = input_replace_url.split(" ")
-                    if not requests.get(new_url, headers={"User-Agent": "Mozilla/5.0"}).ok:
+                    if not __check_request(new_url, time.time() + Config.LINK_VALIDATION_DEADLINE)[0]:
                         print("Invalid link")
                         continue
                     del links[invalid_link_name]
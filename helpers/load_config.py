@@ -0,0 +1,146 @@
+import os
+from typing import Any
+
+import yaml
+
+from helpers.print_sign import print_sign
+from variables.Config import Config
+
+CONFIG_FILE = "config.yaml"
+
+# keys that can change between posts, everything else is only read when the browser/bot starts
+RUNTIME_SAFE_KEYS = {
+    "DEBUG_MODE",
+    "DUMP_SCRAPED_POST_TO_JSON",
+    "DUMP_TELEGRAM_RESPOND_TO_JSON",
+    "DUMP_DATA_GOING_TO_BE_SENT_TO_TELEGRAM",
+    "WAIT_ELEM_TIMEOUT",
+    "ADAPTIVE_ELEM_TIMEOUT",
+    "MAX_PREFETCH_TABS",
+    "GALLERY_MAX_POSTS",
+    "RECYCLE_MAX_RSS_MB",
+    "RECYCLE_MAX_PAGES",
+    "DISABLE_NOTIFICATION",
+    "TELEGRAM_MAX_RETRIES",
+    "IGNORE_LINK_VALIDATION",
+    "LINK_VALIDATION_DEADLINE",
+    "LINK_VALIDATION_TIMEOUT",
+    "CIRCUIT_BREAKER_FAILURES",
+    "CIRCUIT_BREAKER_COOLDOWN",
+    "LINK_CACHE_TTL_HOURS",
+    "BLACKLIST_ACCOUNTS",
+    "AUTO_MODE",
+    "AUTO_MODE_ASK_HASHTAGS",
+    "DAEMON_SUBMITTERS",
+    "WATCH_ARTISTS",
+    "WATCH_INTERVAL",
+    "WATCH_REQUEST_TIMEOUT",
+    "WATCH_MAX_BACKOFF",
+    "WATCH_X_RSS_HOST",
+    "REPOST_DETECTION",
+    "REPOST_MAX_DISTANCE",
+    "MEDIA_DOWNLOAD_TIMEOUT",
+    "REUSE_FILE_IDS",
+    "PREPROCESS_IMAGES",
+    "PHOTO_MAX_SIDE",
+    "PHOTO_MAX_MB",
+    "ORIGINALS_AS_DOCUMENTS",
+}
+
+__mtime = 0.0
+
+
+def __defaults() -> dict[str, Any]:
+    return {key: value for key, value in vars(Config).items() if not key.startswith("__") and not callable(value)}
+
+
+def __validate(key: str, value: Any, default: Any) -> tuple[Any, str]:
+    """Return (value converted to the type of the default, error message)"""
+    match default:
+        case list() | dict() | str() if value is None:
+            return type(default)(), ""  # empty key
+        case _ if value is None:
+            return default, ""
+        case bool():
+            if isinstance(value, bool):
+                return value, ""
+        case int():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return value, ""  # e.g. a timeout of 2.5 where the default is 5
+        case float():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return float(value), ""
+        case str():
+            if isinstance(value, (str, int)) and not isinstance(value, bool):
+                return value, ""  # chat_id can be a number
+        case list():
+            if isinstance(value, list):
+                return value, ""
+            if isinstance(value, (str, int)) and not isinstance(value, bool):
+                return ([value] if value != "" else []), ""  # a single item, e.g. one chat_id
+        case dict():
+            if isinstance(value, dict):
+                return value, ""
+        case _:
+            return value, ""
+    return default, f"{key.lower()} should be {type(default).__name__}, got {type(value).__name__} ({value!r})"
+
+
+def __parse(path: str) -> tuple[dict[str, Any], list[str]]:
+    """Parse the file once, return (valid values by Config attribute name, errors)"""
+    with open(path, "r", encoding="utf-8") as f:
+        raw: dict[str, Any] = yaml.safe_load(f) or {}
+
+    defaults = __defaults()
+    keys = {key.casefold(): key for key in defaults}
+    values: dict[str, Any] = {}
+    errors: list[str] = []
+    for raw_key, raw_value in raw.items():
+        if (key := keys.get(str(raw_key).casefold())) is None:
+            errors.append(f"unknown key {raw_key}")
+            continue
+        value, error = __validate(key, raw_value, defaults[key])
+        if error:
+            errors.append(error)
+            continue
+        values[key] = value
+    return values, errors
+
+
+def load_config(path: str = CONFIG_FILE) -> None:
+    """Read config.yaml into `Config`"""
+    global __mtime
+    __mtime = os.path.getmtime(path)
+    values, errors = __parse(path)
+    for error in errors:
+        print_sign("Config", error)
+    for key, value in values.items():
+        setattr(Config, key, value)
+
+
+def reload_config(path: str = CONFIG_FILE) -> list[str]:
+    """Apply the runtime-safe keys of config.yaml again if the file changed, return the keys that changed"""
+    global __mtime
+    try:
+        if (mtime := os.path.getmtime(path)) == __mtime:
+            return []
+        __mtime = mtime
+        values, errors = __parse(path)
+    except Exception as e:
+        print_sign("Config", f"cannot reload {path}: {e}")
+        return []
+    for error in errors:
+        print_sign("Config", error)
+
+    changed: list[str] = []
+    for key, value in values.items():
+        if getattr(Config, key) == value:
+            continue
+        if key not in RUNTIME_SAFE_KEYS:
+            print_sign("Config", f"{key.lower()} changed, restart to apply it")
+            continue
+        setattr(Config, key, value)
+        changed.append(key)
+    if changed:
+        print_sign("Config", "reloaded", ", ".join(key.lower() for key in changed))
+    return changed
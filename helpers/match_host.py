@@ -22,6 +22,6 @@ def match_host(input_str: str, browser: Browser) -> Result[PlatformBase, str]:
     input_str = input_str.strip().replace("www.", "")
     if not (found_a_math := re.search(r"(https?:\/\/)?([A-Za-z0-9.-]+)", input_str)):
         return Err("Cannot parse the domain")
-    if (domain := found_a_math.group(2)) not in hosts:
+    if (platform := hosts.match(domain := found_a_math.group(2))).is_none:
         return Err(f"{domain} is not supported yet")
-    return Ok(hosts[domain](browser))
+    return Ok(platform.value(browser))
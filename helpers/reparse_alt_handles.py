@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from classes.NewArtist import ArtistInfoData, parse_alt_handle, rm_dupl_handles
+from variables.Config import Config
+
+# below this many artists, starting worker processes costs more than parsing the links
+PARALLEL_THRESHOLD = 5000
+
+
+def __digest(social_media: dict[str, str], alt_handles: set[str] | list[str]) -> str:
+    data = json.dumps([social_media, sorted(alt_handles)], sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _parse_chunk(chunk: list[tuple[str, list[str]]]) -> list[tuple[str, set[str]]]:
+    """(handle, links) -> (handle, handles found in the links), runs in a worker process"""
+    return [(handle, {parse_alt_handle(link) for link in links}) for handle, links in chunk]
+
+
+def reparse_alt_handles(
+    artists_info: dict[str, ArtistInfoData], artists_alt_handles: dict[str, set[str]], full: bool = False
+) -> dict[str, set[str]]:
+    """Re-extract every artist's alt handles from their social links in one pass, return the new alt handles dict.
+    Artists whose links and alt handles didn't change since the last run are skipped unless `full` is set"""
+    hashes: dict[str, str] = {}
+    if not full and os.path.isfile(Config.ARTISTS_ALT_HANDLES_HASH_FILE):
+        with open(file=Config.ARTISTS_ALT_HANDLES_HASH_FILE, mode="r", encoding="utf-8") as f:
+            hashes = json.load(f)
+
+    # casefolded main handle -> main handle, instead of a case-insensitive scan of every key per artist
+    index = {handle.casefold(): handle for handle in artists_alt_handles}
+
+    def existing(handle: str) -> set[str] | list[str]:
+        return artists_alt_handles[key] if (key := index.get(handle.casefold())) is not None else []
+
+    todo = [
+        (handle, list(info.social_media.values()))
+        for handle, info in artists_info.items()
+        if hashes.get(handle) != __digest(info.social_media, existing(handle))
+    ]
+
+    if len(todo) < PARALLEL_THRESHOLD:
+        parsed = _parse_chunk(todo)
+    else:
+        workers = os.cpu_count() or 1
+        chunk_size = len(todo) // (workers * 4) + 1
+        with ProcessPoolExecutor(workers) as executor:
+            chunks = executor.map(_parse_chunk, [todo[i : i + chunk_size] for i in range(0, len(todo), chunk_size)])
+            parsed = [item for chunk in chunks for item in chunk]
+
+    result = dict(artists_alt_handles)
+    for handle, alt_handles in parsed:
+        alt_handles |= set(existing(handle))
+        if (key := index.get(handle.casefold())) is not None and key != handle:
+            del result[key]
+        result[handle] = rm_dupl_handles(alt_handles, handle)
+    result = {handle: alt_handles for handle, alt_handles in result.items() if len(alt_handles) > 0}
+
+    # looked up the way `existing` will find them on the next run, a key may differ from the artist's in case
+    index = {handle.casefold(): handle for handle in result}
+    new_hashes = {
+        handle: __digest(info.social_media, result.get(index.get(handle.casefold(), handle), []))
+        for handle, info in artists_info.items()
+    }
+    with open(file=Config.ARTISTS_ALT_HANDLES_HASH_FILE, mode="w", encoding="utf-8") as f:
+        json.dump(new_hashes, f)
+
+    print(f"Reparsed {len(parsed)} artists, {len(artists_info) - len(parsed)} unchanged")
+    return result
@@ -1,23 +1,101 @@
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
 
 import requests
 from option import Err, Ok, Option, Result, Some
 
+from classes.FileIdCache import FileIdCache
+from classes.ImageHashIndex import MediaHash
+from classes.ImagePreprocessor import FittedImage
+from helpers.md_format import md_format
+from helpers.print_sign import print_sign
 from variables.Config import Config
 
+# bots can't upload files bigger than this
+MAX_UPLOAD_BYTES = 50 * 1024 * 1024
+# media in one sendMediaGroup
+MAX_ALBUM_SIZE = 10
 
-def __compose_message(content: str) -> Option[dict[str, str | bool]]:
+__file_ids: FileIdCache | None = None
+
+
+@dataclass
+class Destination:
+    chat_id: str | int
+    disable_notification: bool
+    spoiler: bool = False  # always mark the media as spoiler
+    caption: bool = True  # False: only the media
+    footer: str = ""  # plain text line under the caption
+
+
+def destinations() -> list[Destination]:
+    """`Config.CHAT_ID` entries, a chat id or a dict of the id and its options"""
+    result: list[Destination] = []
+    for entry in Config.CHAT_ID:
+        if not isinstance(entry, dict):
+            result.append(Destination(entry, Config.DISABLE_NOTIFICATION))
+            continue
+        result.append(
+            Destination(
+                chat_id=entry.get("id", ""),
+                disable_notification=bool(entry.get("disable_notification", Config.DISABLE_NOTIFICATION)),
+                spoiler=bool(entry.get("spoiler", False)),
+                caption=bool(entry.get("caption", True)),
+                footer=str(entry.get("footer", "")),
+            )
+        )
+    return [destination for destination in result if destination.chat_id != ""]
+
+
+def __file_id_cache() -> FileIdCache:
+    global __file_ids
+    if __file_ids is None:
+        __file_ids = FileIdCache()
+    return __file_ids
+
+
+def __sent_file_id(message: dict[str, Any]) -> str:
+    """file_id of the media in a sent message, the largest size for photos"""
+    if photo := message.get("photo"):
+        return photo[-1]["file_id"]
+    for media_type in ("video", "animation", "document"):
+        if media_type in message:
+            return message[media_type]["file_id"]
+    return ""
+
+
+def __caption(content: str, destination: Destination, has_media: bool) -> str:
+    if not content or (has_media and not destination.caption):
+        return ""
+    return f"{content}\n{md_format(destination.footer)}" if destination.footer else content
+
+
+@dataclass
+class SentMessages:
+    message_ids: list[int] = field(default_factory=list)
+    file_ids: list[str] = field(default_factory=list)  # of the album's media, "" for the ones without
+    document_ids: list[str] = field(default_factory=list)  # of the originals sent as files under it
+
+
+def __compose_message(content: str, destination: Destination) -> Option[dict[str, str | bool]]:
     data = {
-        "chat_id": Config.CHAT_ID,
+        "chat_id": destination.chat_id,
         "text": content,
         "parse_mode": "MarkdownV2",
-        "disable_notification": Config.DISABLE_NOTIFICATION,
+        "disable_notification": destination.disable_notification,
     }
     return Some(data)
 
 
 def __compose_media_message(
-    content: str, media_urls: list[str], media_type: str = "photo", mark_media_spoiler: bool = False
+    content: str,
+    media_urls: list[str],
+    destination: Destination,
+    media_type: str = "photo",
+    mark_media_spoiler: bool = False,
 ) -> Option[dict[str, str | bool]]:
     media_processed: list[dict[str, str | bool]] = [
         {
@@ -40,42 +118,207 @@ def __compose_media_message(
     )
 
     data = {
-        "chat_id": Config.CHAT_ID,
+        "chat_id": destination.chat_id,
         "media": json.dumps(media_processed),
-        "disable_notification": Config.DISABLE_NOTIFICATION,
+        "disable_notification": destination.disable_notification,
     }
     return Some(data)
 
 
-def send_telegram_message(
-    content: str, media_urls: list[str] | None = None, media_type: str = "photo", mark_media_spoiler: bool = False
-) -> Result[None, str]:
-    """
-    Send a message to telegram chat
-    - content (str): message content
-    - media (list[str] | None, optional): list of media url. Defaults to None.
-    - media_type (str, optional): type of media, "photo" or "video". Defaults to "photo".
-    """
+def __sending(
+    destination: Destination,
+    content: str,
+    media: list[str] | None,
+    media_type: str,
+    mark_media_spoiler: bool,
+    files: dict[str, tuple[str, bytes]] | None = None,
+    reply_to: int = 0,
+) -> Result[list[dict[str, Any]], str]:
+    """Call the Bot API once, waiting out its rate limit, return the sent messages. `files` are (filename, bytes) by
+    the name the media refers to them with (attach://<name>)"""
+    if media is not None and len(media) > MAX_ALBUM_SIZE:
+        # one album after another, the caption goes with the first
+        messages: list[dict[str, Any]] = []
+        for start in range(0, len(media), MAX_ALBUM_SIZE):
+            chunk = media[start : start + MAX_ALBUM_SIZE]
+            chunk_files = {name: file for name, file in (files or {}).items() if f"attach://{name}" in chunk}
+            res = __sending(
+                destination, content if start == 0 else "", chunk, media_type, mark_media_spoiler, chunk_files, reply_to
+            )
+            if res.is_err:
+                return res
+            messages += res.unwrap()
+        return Ok(messages)
 
-    api = "sendMessage" if media_urls is None else "sendMediaGroup"
-    if media_urls is None:
-        data = __compose_message(content)
+    api = "sendMessage" if media is None else "sendMediaGroup"
+    content = __caption(content, destination, media is not None)
+    if media is None:
+        data = __compose_message(content, destination)
     else:
-        data = __compose_media_message(content, media_urls, media_type, mark_media_spoiler)
+        spoiler = (mark_media_spoiler or destination.spoiler) and media_type != "document"
+        data = __compose_media_message(content, media, destination, media_type, spoiler)
+    if reply_to:
+        data.unwrap()["reply_to_message_id"] = reply_to  # type: ignore
 
     if Config.DUMP_DATA_GOING_TO_BE_SENT_TO_TELEGRAM:
         with open("debug_data_going_to_be_sent_to_telegram.json", "w") as f:
             json.dump(data.unwrap(), f, indent=4)
 
-    respond = requests.post(
-        f"https://api.telegram.org/bot{Config.BOT_API_KEY}/{api}",
-        data=data.unwrap(),
-    )
+    for _ in range(Config.TELEGRAM_MAX_RETRIES + 1):
+        respond = requests.post(
+            f"https://api.telegram.org/bot{Config.BOT_API_KEY}/{api}",
+            data=data.unwrap(),
+            files=files or None,
+        )
+        if respond.status_code != 429:
+            break
+        # too many messages to this chat, Telegram says how long to wait
+        time.sleep(respond.json().get("parameters", {}).get("retry_after", 1))
 
     if Config.DUMP_TELEGRAM_RESPOND_TO_JSON:
         with open("debug_telegram_response.json", "w") as f:
             json.dump(respond.json(), f, indent=4)
 
     if str(respond.status_code).startswith("2"):
-        return Ok(None)
+        result = respond.json()["result"]
+        return Ok(result if isinstance(result, list) else [result])
     return Err(f"Telegram response: {respond.status_code} {respond.reason}")
+
+
+def __media(
+    media_urls: list[str],
+    media_type: str,
+    media_hashes: dict[str, MediaHash],
+    uploads: dict[str, FittedImage],
+    reuse_file_ids: bool,
+) -> tuple[list[str], dict[str, tuple[str, bytes]]]:
+    """What goes in each `media` field: the file_id of media sent before (found by url or by the digest of its bytes),
+    an attached re-encoded image, or the url for Telegram to fetch"""
+    media: list[str] = []
+    files: dict[str, tuple[str, bytes]] = {}
+    for index, url in enumerate(media_urls):
+        file_id = Option.NONE() if not reuse_file_ids else __file_id_cache().get(url, media_type)  # type: ignore
+        if file_id.is_none and reuse_file_ids and url in media_hashes:
+            file_id = __file_id_cache().get(media_hashes[url].digest, media_type)
+        if file_id.is_some:
+            media.append(file_id.value)
+        elif url in uploads:
+            files[f"media{index}"] = (f"media{index}.jpg", uploads[url].data)
+            media.append(f"attach://media{index}")
+        else:
+            media.append(url)
+    return media, files
+
+
+def __uploading(
+    destination: Destination,
+    content: str,
+    media_urls: list[str],
+    media_type: str,
+    mark_media_spoiler: bool,
+    media_hashes: dict[str, MediaHash],
+    uploads: dict[str, FittedImage],
+) -> Result[SentMessages, str]:
+    """Send the media itself (or its cached file_id) to the first destination"""
+    media, files = __media(media_urls, media_type, media_hashes, uploads, Config.REUSE_FILE_IDS)
+    res = __sending(destination, content, media, media_type, mark_media_spoiler, files)
+    if res.is_err and (file_ids := [id_ for id_ in media if "://" not in id_]):
+        # a file_id can stop working (e.g. a new bot token), forget them and send the media itself again
+        __file_id_cache().discard(file_ids)
+        media, files = __media(media_urls, media_type, media_hashes, uploads, False)
+        res = __sending(destination, content, media, media_type, mark_media_spoiler, files)
+    if res.is_err:
+        return Err(res.unwrap_err())
+
+    messages = res.unwrap()
+    sent = SentMessages([message["message_id"] for message in messages], [__sent_file_id(m) for m in messages])
+    if Config.REUSE_FILE_IDS:
+        for url, file_id in zip(media_urls, sent.file_ids):
+            if file_id:
+                digest = media_hashes[url].digest if url in media_hashes else ""
+                __file_id_cache().add([url, digest], media_type, file_id)
+
+    # the full size images that were shrunk, as files under the album
+    originals = [url for url in media_urls if url in uploads and len(uploads[url].original) <= MAX_UPLOAD_BYTES]
+    if originals and Config.ORIGINALS_AS_DOCUMENTS:
+        files = {}
+        for index, url in enumerate(originals):
+            filename = url.split("?")[0].rstrip("/").split("/")[-1] or f"original{index}"
+            files[f"original{index}"] = (filename, uploads[url].original)
+        documents = __sending(
+            destination, "", [f"attach://{name}" for name in files], "document", False, files, sent.message_ids[0]
+        )
+        if documents.is_ok:
+            sent.message_ids += [message["message_id"] for message in documents.unwrap()]
+            sent.document_ids = [__sent_file_id(message) for message in documents.unwrap()]
+    return Ok(sent)
+
+
+def __forwarding(
+    destination: Destination,
+    content: str,
+    media_urls: list[str],
+    media_type: str,
+    mark_media_spoiler: bool,
+    uploaded: SentMessages,
+) -> Result[list[int], str]:
+    """Send what was uploaded to the first destination again by file_id"""
+    file_ids = uploaded.file_ids + [""] * (len(media_urls) - len(uploaded.file_ids))
+    media = [file_id or url for file_id, url in zip(file_ids, media_urls)]
+    if (res := __sending(destination, content, media, media_type, mark_media_spoiler)).is_err:
+        return Err(res.unwrap_err())
+    message_ids = [message["message_id"] for message in res.unwrap()]
+    if document_ids := [file_id for file_id in uploaded.document_ids if file_id]:
+        if (documents := __sending(destination, "", document_ids, "document", False, reply_to=message_ids[0])).is_ok:
+            message_ids += [message["message_id"] for message in documents.unwrap()]
+    return Ok(message_ids)
+
+
+def send_telegram_message(
+    content: str,
+    media_urls: list[str] | None = None,
+    media_type: str = "photo",
+    mark_media_spoiler: bool = False,
+    media_hashes: dict[str, MediaHash] | None = None,
+    uploads: dict[str, FittedImage] | None = None,
+) -> Result[list[int], str]:
+    """
+    Send a message to every destination in `Config.CHAT_ID`, return the ids of the messages in the first one
+    - content (str): message content
+    - media (list[str] | None, optional): list of media url. Defaults to None.
+    - media_type (str, optional): type of media, "photo" or "video". Defaults to "photo".
+    - media_hashes (dict[str, MediaHash] | None, optional): hashes of the downloaded media, by url. Defaults to None.
+    - uploads (dict[str, FittedImage] | None, optional): re-encoded images to upload, by url. Defaults to None.
+    """
+    if not (targets := destinations()):
+        return Err("chat_id is not set")
+    first, others = targets[0], targets[1:]
+
+    if media_urls is None:
+        sent = __sending(first, content, None, media_type, mark_media_spoiler)
+        if sent.is_err:
+            return Err(sent.unwrap_err())
+        message_ids = [message["message_id"] for message in sent.unwrap()]
+
+        def forward(destination: Destination) -> Result[list[int], str]:
+            res = __sending(destination, content, None, media_type, mark_media_spoiler)
+            return Ok([]) if res.is_ok else Err(res.unwrap_err())
+
+    else:
+        uploaded = __uploading(
+            first, content, media_urls, media_type, mark_media_spoiler, media_hashes or {}, uploads or {}
+        )
+        if uploaded.is_err:
+            return Err(uploaded.unwrap_err())
+        message_ids = uploaded.unwrap().message_ids
+
+        def forward(destination: Destination) -> Result[list[int], str]:
+            return __forwarding(destination, content, media_urls, media_type, mark_media_spoiler, uploaded.unwrap())
+
+    # the other chats are independent, one waiting out its rate limit doesn't hold the rest back
+    if others:
+        with ThreadPoolExecutor(len(others)) as executor:
+            for destination, res in zip(others, executor.map(forward, others)):
+                if res.is_err:
+                    print_sign("Error", f"{destination.chat_id}: {res.unwrap_err()}")
+    return Ok(message_ids)
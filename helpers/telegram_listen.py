@@ -1,29 +1,19 @@
-import time
-
-import requests
-
+from classes.TelegramUpdates import TelegramUpdates
 from variables.Config import Config
 
 
 def telegram_listen():
     print("Waiting for /id command...")
 
-    while True:
-        response = requests.post(
-            "https://api.telegram.org/bot" + Config.BOT_API_KEY + "/getUpdates",
-            json={"offset": -1, "limit": 1, "allowed_updates": "message_id", "timeout": 1},
-        )
-        if not str(response.status_code).startswith("2"):
-            raise Exception("Error when sending message to telegram")
-        try:
-            if response.json()["result"][0]["message"]["text"] == "/id":
-                Config.CHAT_ID = response.json()["result"][0]["message"]["chat"]["id"]
-                break
-        except:
-            pass
-        time.sleep(1)
+    updates = TelegramUpdates()
+    chat_ids: list[int] = []
+
+    def on_id(message: dict) -> None:  # type: ignore
+        chat_ids.append(message["chat"]["id"])
+        updates.stop()
+
+    updates.on_command("/id", on_id)
+    updates.run()
 
-    response = requests.post(
-        "https://api.telegram.org/bot" + Config.BOT_API_KEY + "/sendMessage",
-        json={"chat_id": Config.CHAT_ID, "text": Config.CHAT_ID},
-    )
+    Config.CHAT_ID = chat_ids  # type: ignore
+    updates.send_message(chat_ids[0], str(chat_ids[0]))
@@ -2,41 +2,51 @@ import json
 import os
 import sys
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 
 import yaml
 from option import Err, Ok, Option, Result, Some
 
-from classes import ArtistInfoData, Browser, NewArtist, PlatformBase, Post
+from classes import (
+    ArtistInfoData,
+    Browser,
+    Composer,
+    Daemon,
+    ImageHashIndex,
+    ImagePreprocessor,
+    Journal,
+    NewArtist,
+    PlatformBase,
+    Post,
+    ScrapeWorkers,
+    SentIndex,
+    Watcher,
+)
+from classes.ImageHashIndex import MediaHash
+from classes.ImagePreprocessor import FittedImage
 from helpers import insensitive_match  # type: ignore
 from helpers import (
     artists_info_load,
     artists_info_save,
+    audit_links,
     check_invalid_links,
     find_main_handle,
     handle_invalid_links,
+    load_config,
     match_host,
-    md_format,
-    overwrite_sm_name,
     print_sign,
+    reload_config,
+    reparse_alt_handles,
     send_telegram_message,
     telegram_listen,
 )
 from variables import Config, Msg, MsgErr, MsgSign
 
-
-@lambda _: _(Config)  # type: ignore
-def load_config(Config: type[Config]) -> None:
-    for config_key in Config.__dict__.keys():
-        if config_key.startswith("__"):
-            continue
-        with open("config.yaml", "r") as f:
-            config = yaml.safe_load(f)
-            if (key := insensitive_match(config_key, config.keys())).is_some:
-                setattr(Config, config_key, config[key.value])
+load_config()
 
 
 class MainMenu:
-    def __init__(self) -> None:
+    def __init__(self, watch: bool = False) -> None:
         if not Config.BOT_API_KEY:
             print(MsgErr.BOT_API_KEY_NOT_SET)
             sys.exit(1)
@@ -49,47 +59,179 @@ class MainMenu:
         self.__artists_alt_handles: dict[str, set[str]] = {}  # key: main handle, value: set(alt handles)
         self.__artists_info, self.__artists_alt_handles = artists_info_load()
         self.__is_irl = False
+        self.__resend = False
+        self.__thread = False
+        self.__unattended = watch  # nobody's there to answer prompts
+        self.sent_index = SentIndex()
+        self.journal = Journal()
+        self.image_hashes = ImageHashIndex()
+        self.preprocessor = ImagePreprocessor()
+        self.__preparing = ThreadPoolExecutor(1)  # the post's images download while the prompts wait
+        self.composer = Composer(self.__artists_info, self.__artists_alt_handles)
 
         self.browser = Browser()
         self.platform_to_get_username: PlatformBase
+        self.scrape_workers: ScrapeWorkers | None = None
+        self.__prescraped: set[str] = set()
 
         print(Msg.ZERO_2_CANCEL)
         if Config.DEBUG_MODE:
             print(Msg.DEBUG_ENABLED)
 
+        if watch:
+            self.__watching()
+            return
+
+        # posts a crashed or killed session didn't finish go first, as a batch
+        resuming = ""
+        if pending := self.journal.pending():
+            if input(Msg.RESUME_JOURNAL.format(len(pending))).strip() != "0":
+                resuming = " ".join(pending)
+            else:
+                for url in pending:
+                    self.journal.record(url, "dropped")
+
         while True:
             self.__is_irl = False
+            self.__resend = False
+            self.__thread = False
             print_sign(Msg.ENTER_POST_URL)
-            input_url: str = input("🍨 ").strip()
+            input_url: str = resuming or input("🍨 ").strip()
+            resuming = ""
 
             if input_url == "0":
-                print(Msg.CLOSING_SESSION)
-                self.browser.driver.quit()
-                sys.exit(0)
+                self.__closing()
 
             if input_url.startswith("/login "):
                 url = input_url.split(" ")[1].strip().replace("https://", "").replace("http://", "").replace("/", "")
-                self.browser.cookies_create(url, os.path.join(Config.COOKIES_DIR, url), "")
+                if (res := self.browser.cookies_create(url, os.path.join(Config.COOKIES_DIR, url), "")).is_err:
+                    print_sign("Error", res.unwrap_err())
                 continue
 
+            if input_url == "/auto":
+                Config.AUTO_MODE = not Config.AUTO_MODE
+                print(Msg.AUTO_MODE_ON if Config.AUTO_MODE else Msg.AUTO_MODE_OFF)
+                continue
+
+            if input_url.startswith("/resend "):
+                self.__resend = True
+                input_url = input_url[8:].strip()
+
+            if input_url.startswith("/thread "):
+                self.__thread = True
+                input_url = input_url[8:].strip()
+
             if input_url.startswith("/irl "):
                 self.__is_irl = True
-                input_url = input_url.split(" ")[1].strip()
+                input_url = input_url[5:].strip()
+
+            # several urls separated by spaces are processed one after another, galleries are expanded to their posts
+            self.__processing(self.__listing_posts(input_url.split()))
+
+    def __closing(self) -> None:
+        print(Msg.CLOSING_SESSION)
+        self.browser.driver.quit()
+        self.__preparing.shutdown(wait=False, cancel_futures=True)
+        self.preprocessor.close()
+        self.journal.close()
+        if self.scrape_workers is not None:
+            self.scrape_workers.close()
+        sys.exit(0)
+
+    def __processing(self, input_urls: list[str]) -> list[str]:
+        """Scrape and send a batch of post urls one after another. Return the ones that were handled: sent, dropped,
+        left in the journal to resume, or that can't be posted at all"""
+        handled: list[str] = []
+        if len(input_urls) > 1 and Config.SCRAPE_PROCESSES > 0 and not self.__thread:
+            self.__prescrape(input_urls)
+
+        for index, input_url in enumerate(input_urls):
+            reload_config()
+            self.browser.recycle_if_needed()
+            if index + 1 < len(input_urls) and (Config.SCRAPE_PROCESSES <= 0 or self.__thread):
+                self.__prefetch_post(input_urls[index + 1])
 
             if (platform := match_host(input_url, self.browser)).is_ok:
                 self.platform = platform.unwrap()
                 self.platform_to_get_username = platform.unwrap()
             else:
                 print_sign("Error", platform.unwrap_err())
+                handled.append(input_url)
                 continue
 
             if (res := self.platform.has_the_pattern(input_url)).is_none:
                 print(Msg.DOESNT_MATCH_PATTERN)
+                handled.append(input_url)
                 continue
 
+            canonical_url = res.value
             if (res := self.scraping_and_sending(input_url)).is_err:
                 print_sign("Error", res.unwrap_err())
+                # one that failed before anything was journaled (e.g. it couldn't be scraped) is worth another try
+                if self.journal.state(canonical_url):
+                    handled.append(input_url)
+                continue
+            # sent, or cancelled on the way, either way there's nothing left to resume
+            if self.journal.state(canonical_url):
+                self.journal.record(canonical_url, "dropped")
+            handled.append(input_url)
+        return handled
+
+    def __watching(self) -> None:
+        """Send the new posts of the watched artists every `watch_interval` seconds, until interrupted. Posts that
+        need an answer stay in the journal for the next interactive session"""
+        watcher = Watcher(self.__artists_info, self.__artists_alt_handles, self.browser)
+        try:
+            while True:
+                started = time.time()
+                reload_config()
+                if not (listings := watcher.listings()):
+                    print(MsgErr.WATCH_NO_ARTISTS)
+                    break
+                print_sign(Msg.WATCHING.format(len(listings), Config.WATCH_INTERVAL))
+                handled: list[str] = []
+                if posts := watcher.poll():
+                    print_sign(Msg.WATCH_NEW_POSTS.format(len(posts)))
+                    handled = self.__processing(posts)
+                watcher.commit(handled)
+                time.sleep(max(Config.WATCH_INTERVAL - (time.time() - started), 0))
+        except KeyboardInterrupt:
+            pass
+        self.__closing()
+
+    def __is_sent(self, url: str) -> bool:
+        """Whether a canonical post url was already sent, unless it's being resent on purpose"""
+        return not self.__resend and url in self.sent_index
+
+    def __listing_posts(self, input_urls: list[str]) -> list[str]:
+        """Replace gallery urls with the posts in them that weren't sent yet, oldest first"""
+        urls: list[str] = []
+        for input_url in input_urls:
+            if (platform := match_host(input_url, self.browser)).is_err:
+                urls.append(input_url)
+                continue
+            if (posts := platform.unwrap().list_posts(input_url, self.__is_sent)).is_none:
+                urls.append(input_url)
                 continue
+            print_sign(Msg.GALLERY_POSTS.format(len(posts.value)))
+            urls.extend(reversed(posts.value))
+        return urls
+
+    def __prefetch_post(self, input_url: str) -> None:
+        """Start loading the next post of a batch in a background tab"""
+        if (platform := match_host(input_url, self.browser)).is_ok:
+            if (url := platform.unwrap().has_the_pattern(input_url)).is_some and not self.__is_sent(url.value):
+                self.browser.prefetch(url.value)
+
+    def __prescrape(self, input_urls: list[str]) -> None:
+        """Hand the whole batch to the scrape workers so the posts are ready by the time they're reached"""
+        if self.scrape_workers is None:
+            self.scrape_workers = ScrapeWorkers()
+        for input_url in input_urls:
+            if (platform := match_host(input_url, self.browser)).is_ok:
+                if (url := platform.unwrap().has_the_pattern(input_url)).is_some and not self.__is_sent(url.value):
+                    self.scrape_workers.submit(url.value)
+                    self.__prescraped.add(url.value)
 
     # region: load/save artist info into yaml file
 
@@ -134,6 +276,18 @@ class MainMenu:
                 case foo:
                     return Some(all_handles[int(foo) - 1])
 
+    def __step__auto_mode(self, post: Post, all_handles: list[str]) -> Option[str]:
+        """Return the artist's main handle if the post can skip the prompts:
+        auto mode is on, the poster is the only handle, it belongs to exactly one artist in the DB and isn't
+        blacklisted, and the platform isn't configured to always ask for extra hashtags"""
+        if not (Config.AUTO_MODE or self.__unattended) or len(all_handles) != 1:
+            return Option.NONE()  # type: ignore
+        if insensitive_match(self.platform.title, Config.AUTO_MODE_ASK_HASHTAGS).is_some:
+            return Option.NONE()  # type: ignore
+        if insensitive_match(post.handle, Config.BLACKLIST_ACCOUNTS).is_some:
+            return Option.NONE()  # type: ignore
+        return find_main_handle(post.handle, self.__artists_alt_handles, self.__artists_info, unambiguous=True)
+
     def __step__get_artist_username(
         self, artist_handle: str, post_er_handle: str, post_er_uname: str
     ) -> Result[str, str]:
@@ -152,109 +306,163 @@ class MainMenu:
         print_sign(MsgSign.GET_USERNAME, artist_uname, start_line="")
         return Ok(artist_uname)
 
+    def __step__check_repost(self, media_hashes: dict[str, MediaHash], is_auto: bool) -> Option[str]:
+        """Return "0" if the images were already sent with another post and the user (or auto mode) skips it"""
+        if not Config.REPOST_DETECTION or self.__resend:
+            return Some("")
+        if (repost := self.image_hashes.find([hash_.dhash for hash_ in media_hashes.values()])).is_none:
+            return Some("")
+        print_sign(MsgErr.LIKELY_REPOST.format(*repost.value))
+        if is_auto:
+            print(Msg.AUTO_MODE_SKIP_REPOST)
+            return Some("0")
+        return Some("0" if input(Msg.SEND_REPOST_ANYWAY).strip() == "0" else "")
+
     def __step_composing(
         self, post: Post, artist_uname: str, artist_handle: str, all_handles: list[str], more_hashtags: list[str]
     ) -> Option[str]:
-        artist_obj = self.__artists_info[artist_handle]
-
-        post.content = md_format(post.content)
-        post.url = md_format(post.url)
-        delimeter = "\n`" + "—" * 20 + "`"
-
-        if artist_obj.country_flag not in artist_uname:
-            artist_uname += " " + artist_obj.country_flag
-        artist_uname = md_format(artist_uname).strip()
-
-        social_media_links = ", ".join(
-            f"[{md_format(overwrite_sm_name(name))}]({md_format(link)})"
-            for name, link in artist_obj.social_media.items()
-        )
-        video_hashtag = "#ANI " if post.media_type == "video" else ""
-        artist_hashtag_list = [hashtag for hashtag in artist_obj.hashtag_represent.split(" ")] + [artist_handle]
-        artist_hashtag_list.extend(key for key, value in self.__artists_alt_handles.items() if artist_handle in value)
-        post_hashtags_list = [hashtag[0] for hashtag in post.hashtag_link]
-
-        # can't use set() because it will change the order
-        hashtags_list: list[str] = []
-        for hashtag in artist_hashtag_list + all_handles + more_hashtags + post_hashtags_list:
-            if hashtag.strip() and hashtag.lower() not in [hashtag.lower() for hashtag in hashtags_list]:
-                hashtags_list.append(hashtag.strip())
-        hashtags = " ".join(f"#{hashtag}" if not hashtag.startswith("#") else hashtag for hashtag in hashtags_list)
-
-        cw_irl = f"`CW: IRL content`{delimeter}\n" if self.__is_irl else ""
-
-        message = f"""\
-            {cw_irl}{post.content}{delimeter if post.content else ""}
-            [Sauce]({post.url}) \\| {artist_uname}
-            {social_media_links}
-            _{md_format(video_hashtag)}{md_format(hashtags)}_
-        """
-        return Some("\n".join(line.strip() for line in message.split("\n")))
+        return Some(self.composer.compose(post, artist_uname, artist_handle, all_handles, more_hashtags, self.__is_irl))
 
     # endregion
 
     def scraping_and_sending(self, post_url: str) -> Result[None, str]:
-        print_sign(MsgSign.SCRAPE.format(self.platform.post), end_line="\r")
-        start_time = time.time()
-        post = self.platform.scrape(post_url).value
-        print_sign(
-            MsgSign.SCRAPE.format(self.platform.post),
-            f"{round(time.time() - start_time, 2)} seconds",
-            self.platform.title,
-            start_line="",
-        )
-
-        if Config.DUMP_SCRAPED_POST_TO_JSON:
-            with open(file=f"debug_scraped_post_{post_url}.json", mode="w", encoding="utf-8") as f:
-                json.dump(post.dict, f, indent=4)
-
-        if Config.DEBUG_MODE:
-            print(yaml.dump(post.dict, sort_keys=False, indent=4, allow_unicode=True))
-            return Ok(None)
-
-        # --- Selecting which handle appears in the post is the artist ---
-        print_sign(MsgSign.ACTUAL_HANDLE)
-        all_handles = [post.handle] + [mention[0] for mention in post.mention_link if mention[0] != post.handle]
-        if (artist_handle := self.__step__ask_artist_handle(all_handles).unwrap()) == "0":
-            return Ok(None)
-        if (_artist_uname := self.__step__get_artist_username(artist_handle, post.handle, post.username)).is_err:
-            return Err(_artist_uname.unwrap_err())  # type: ignore
-        elif (artist_uname := _artist_uname.unwrap()) == "0":
-            return Ok(None)
-
-        # --- Additional hashtags ---
-        print_sign(MsgSign.MORE_HASHTAGS)
-        if (more_hashtags := self.__step__ask_more_hashtags().unwrap()) == "0":
+        canonical_url = self.platform.has_the_pattern(post_url).value
+        if self.__is_sent(canonical_url):
+            sent = self.sent_index.get(canonical_url).unwrap()
+            print_sign(Msg.ALREADY_SENT.format(time.strftime("%Y-%m-%d %H:%M", time.localtime(sent.sent_at))))
             return Ok(None)
 
-        # --- If handle not found in DB, create ---
-        if (_artist_handle := find_main_handle(artist_handle, self.__artists_alt_handles, self.__artists_info)).is_some:
-            artist_handle = _artist_handle.value
+        # stages a previous session already went through for this post are picked up from the journal
+        state = self.journal.state(canonical_url)
+        # a post journaled with other fields than Post has now is scraped again
+        if "scraped" in state and (resumed := Post.from_row(state["scraped"]["post"])).is_some:
+            print_sign(Msg.RESUMED.format(", ".join(state.keys())))
+            post = resumed.value
+            self.__is_irl = state["scraped"]["is_irl"]
         else:
-            print_sign(MsgErr.ARTIST_NOT_FOUND)
-            if NewArtist(artist_handle, self.__artists_info, self.__artists_alt_handles).new().unwrap() == "0":
+            print_sign(MsgSign.SCRAPE.format(self.platform.post), end_line="\r")
+            start_time = time.time()
+            if canonical_url in self.__prescraped:
+                self.__prescraped.discard(canonical_url)
+                post_ = self.scrape_workers.get(canonical_url)  # type: ignore
+            elif self.__thread:
+                post_ = self.platform.scrape_thread(post_url)
+            else:
+                post_ = self.platform.scrape(post_url)
+            if post_.is_none:
+                return Err(MsgErr.CANNOT_SCRAPE)
+            post = post_.value
+            print_sign(
+                MsgSign.SCRAPE.format(self.platform.post),
+                f"{round(time.time() - start_time, 2)} seconds",
+                self.platform.title,
+                start_line="",
+            )
+
+            post_dict = post.dict if Config.DUMP_SCRAPED_POST_TO_JSON or Config.DEBUG_MODE else {}
+            if Config.DUMP_SCRAPED_POST_TO_JSON:
+                with open(file=f"debug_scraped_post_{post_url}.json", mode="w", encoding="utf-8") as f:
+                    json.dump(post_dict, f, indent=4)
+
+            if Config.DEBUG_MODE:
+                print(yaml.dump(post_dict, sort_keys=False, indent=4, allow_unicode=True))
                 return Ok(None)
-            artists_info_save(self.__artists_info, self.__artists_alt_handles)
+            self.journal.record(canonical_url, "scraped", post=post.to_row(), is_irl=self.__is_irl)
 
-        artist_obj = self.__artists_info[artist_handle]
+        prepared: Future[tuple[dict[str, MediaHash], dict[str, FittedImage]]] | None = None
+        if post.media_type == "photo" and (Config.REPOST_DETECTION or Config.PREPROCESS_IMAGES):
+            prepared = self.__preparing.submit(self.preprocessor.prepare, post.media)
 
-        # --- Validate sm links ---
-        print_sign(MsgSign.VALIDATE_LINKS)
-        if (invalid_links := check_invalid_links(artist_obj.social_media, self.browser)).is_some:
-            print_sign(MsgErr.FOUND_INVALID_LINKS)
-            if handle_invalid_links(artist_obj.social_media, invalid_links.unwrap()).unwrap() == "0":
+        all_handles = [post.handle] + [mention[0] for mention in post.mention_link if mention[0] != post.handle]
+        if "answered" in state and state["answered"]["artist_handle"] in self.__artists_info:
+            artist_handle, artist_uname, more_hashtags, is_auto = (
+                state["answered"][key] for key in ("artist_handle", "artist_uname", "more_hashtags", "is_auto")
+            )
+        else:
+            if (auto_handle := self.__step__auto_mode(post, all_handles)).is_some:
+                # --- Known artist, nothing to ask ---
+                print_sign(MsgSign.AUTO_MODE, auto_handle.value)
+                artist_handle, artist_uname, more_hashtags = auto_handle.value, post.username, ""
+            elif self.__unattended:
+                return Err(MsgErr.WATCH_NEEDS_INPUT)
+            else:
+                # --- Selecting which handle appears in the post is the artist ---
+                # the mentioned accounts' profiles load in the background while the prompt waits
+                for handle in all_handles[1 : Config.MAX_PREFETCH_TABS]:
+                    if (url := self.platform_to_get_username.username_url(handle)).is_some:
+                        self.browser.prefetch(url.value)
+                print_sign(MsgSign.ACTUAL_HANDLE)
+                if (artist_handle := self.__step__ask_artist_handle(all_handles).unwrap()) == "0":
+                    return Ok(None)
+                _artist_uname = self.__step__get_artist_username(artist_handle, post.handle, post.username)
+                if _artist_uname.is_err:
+                    return Err(_artist_uname.unwrap_err())  # type: ignore
+                elif (artist_uname := _artist_uname.unwrap()) == "0":
+                    return Ok(None)
+
+                # --- Additional hashtags ---
+                print_sign(MsgSign.MORE_HASHTAGS)
+                if (more_hashtags := self.__step__ask_more_hashtags().unwrap()) == "0":
+                    return Ok(None)
+            is_auto = auto_handle.is_some
+
+            # --- If handle not found in DB, create ---
+            _artist_handle = find_main_handle(artist_handle, self.__artists_alt_handles, self.__artists_info)
+            if _artist_handle.is_some:
+                artist_handle = _artist_handle.value
+            else:
+                print_sign(MsgErr.ARTIST_NOT_FOUND)
+                if NewArtist(artist_handle, self.__artists_info, self.__artists_alt_handles).new().unwrap() == "0":
+                    return Ok(None)
+                artists_info_save(self.__artists_info, self.__artists_alt_handles)
+                self.composer.invalidate()
+            self.journal.record(
+                canonical_url,
+                "answered",
+                artist_handle=artist_handle,
+                artist_uname=artist_uname,
+                more_hashtags=more_hashtags,
+                is_auto=is_auto,
+            )
+
+        if "composed" in state:
+            message: str = state["composed"]["message"]
+            media_hashes, uploads = prepared.result() if prepared is not None else ({}, {})
+        else:
+            artist_obj = self.__artists_info[artist_handle]
+
+            # --- Validate sm links ---
+            print_sign(MsgSign.VALIDATE_LINKS)
+            if (invalid_links := check_invalid_links(artist_obj.social_media, self.browser)).is_some:
+                print_sign(MsgErr.FOUND_INVALID_LINKS)
+                if is_auto:
+                    print(Msg.AUTO_MODE_INVALID_LINKS)
+                elif handle_invalid_links(artist_obj.social_media, invalid_links.unwrap()).unwrap() == "0":
+                    return Ok(None)
+                artists_info_save(self.__artists_info, self.__artists_alt_handles)
+                self.composer.invalidate(artist_handle)
+
+            # --- Same images sent with another post ---
+            media_hashes, uploads = prepared.result() if prepared is not None else ({}, {})
+            if self.__step__check_repost(media_hashes, is_auto).unwrap() == "0":
                 return Ok(None)
-            artists_info_save(self.__artists_info, self.__artists_alt_handles)
 
-        # --- Compose ---
-        print_sign(MsgSign.COMPOSE)
-        message = self.__step_composing(post, artist_uname, artist_handle, all_handles, more_hashtags.split()).unwrap()
+            # --- Compose ---
+            print_sign(MsgSign.COMPOSE)
+            composing = self.__step_composing(post, artist_uname, artist_handle, all_handles, more_hashtags.split())
+            message = composing.unwrap()
+            self.journal.record(canonical_url, "composed", message=message)
 
         # --- Send ---
         print_sign(MsgSign.SEND, end_line="\r")
         timer = time.time()
-        if (res := send_telegram_message(message, post.media, post.media_type, self.__is_irl)).is_ok:
+        if (
+            res := send_telegram_message(message, post.media, post.media_type, self.__is_irl, media_hashes, uploads)
+        ).is_ok:
             print_sign(MsgSign.SEND, f"{round(time.time() - timer, 2)} seconds", start_line="")
+            self.sent_index.add(canonical_url, res.unwrap())
+            self.image_hashes.add(canonical_url, [hash_.dhash for hash_ in media_hashes.values()])
+            self.journal.record(canonical_url, "sent", message_ids=res.unwrap())
             return Ok(None)
         else:
             print_sign(MsgSign.SEND, "Error", start_line="")
@@ -265,23 +473,31 @@ def main():
     if (len(sys.argv)) == 1:
         MainMenu()
         return
+    elif sys.argv[1] == "--daemon":
+        if not Config.BOT_API_KEY or not Config.CHAT_ID:
+            print(MsgErr.BOT_API_KEY_NOT_SET if not Config.BOT_API_KEY else MsgErr.CHAT_ID_NOT_SET)
+            sys.exit(1)
+        Daemon().run()
+    elif sys.argv[1] == "--watch":
+        if not Config.BOT_API_KEY or not Config.CHAT_ID:
+            print(MsgErr.BOT_API_KEY_NOT_SET if not Config.BOT_API_KEY else MsgErr.CHAT_ID_NOT_SET)
+            sys.exit(1)
+        MainMenu(watch=True)
+    elif sys.argv[1] == "--audit-links":
+        artists_info, _ = artists_info_load()
+        browser = Browser()
+        try:
+            report = audit_links(artists_info, browser)
+        finally:
+            browser.driver.quit()
+        print(
+            Msg.AUDIT_DONE.format(report["links"], report["invalid"], report["unreachable"], Config.AUDIT_REPORT_FILE)
+        )
     elif sys.argv[1] == "--reparse-alt-handles":
         artists_info: dict[str, ArtistInfoData] = {}
         artists_alt_handles: dict[str, set[str]] = {}
         artists_info, artists_alt_handles = artists_info_load()
-        for artist_handle, artist_obj in artists_info.items():
-            artists_alt_handles[artist_handle] = NewArtist(
-                artist_handle, artists_info, artists_alt_handles
-            ).process_alt_handles(artist_obj.social_media)
-
-        handles_to_be_deleted: list[str] = []
-        for main_handle, alt_handles in artists_alt_handles.items():
-            if len(alt_handles) == 0:
-                handles_to_be_deleted.append(main_handle)
-
-        for handle in handles_to_be_deleted:
-            del artists_alt_handles[handle]
-
+        artists_alt_handles = reparse_alt_handles(artists_info, artists_alt_handles, full="--full" in sys.argv)
         artists_info_save(artists_info, artists_alt_handles)
 
 
@@ -9,12 +9,71 @@ class Config:
     COOKIES_DIR = ""
     USER_DATA_DIR = ""
     WAIT_ELEM_TIMEOUT = 10
+    ADAPTIVE_ELEM_TIMEOUT = True
+    HEADLESS = False
+    PAGE_LOAD_STRATEGY = "eager"
+    RECYCLE_MAX_RSS_MB = 2048
+    RECYCLE_MAX_PAGES = 500
+    BLOCK_RESOURCES = True
+    BLOCKED_URLS: list[str] = [
+        "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+        "*.woff", "*.woff2", "*.ttf", "*.otf",
+        "*.mp4", "*.webm", "*.m3u8", "*.m4s",
+        "*pbs.twimg.com/media/*", "*video.twimg.com/*", "*d.furaffinity.net/*", "*a.furaffinity.net/*",
+        "*google-analytics.com/*", "*googletagmanager.com/*", "*doubleclick.net/*", "*googlesyndication.com/*",
+        "*scorecardresearch.com/*", "*quantserve.com/*",
+    ]  # fmt: skip
+    SCRAPE_PROCESSES = 0
+    MAX_PREFETCH_TABS = 3
+    GALLERY_MAX_POSTS = 200
 
     BOT_API_KEY = ""
-    CHAT_ID = ""
+    CHAT_ID: list[str | int | dict[str, str | int | bool]] = []
+    LONG_POLL_TIMEOUT = 50
     DISABLE_NOTIFICATION = True
+    TELEGRAM_MAX_RETRIES = 3
     IGNORE_LINK_VALIDATION: list[str] = []
+    LINK_VALIDATION_DEADLINE = 20
+    LINK_VALIDATION_TIMEOUT = 5
+    CIRCUIT_BREAKER_FAILURES = 2
+    CIRCUIT_BREAKER_COOLDOWN = 300
+    LINK_CACHE_TTL_HOURS = 36
+    AUDIT_WORKERS = 16
+    AUDIT_PER_HOST = 2
     BLACKLIST_ACCOUNTS: list[str] = []
 
+    AUTO_MODE = False
+    AUTO_MODE_ASK_HASHTAGS: list[str] = []
+
+    DAEMON_WORKERS = 1
+    DAEMON_SUBMITTERS: list[str] = []
+
+    WATCH_ARTISTS: list[str] = []
+    WATCH_INTERVAL = 900
+    WATCH_REQUEST_TIMEOUT = 15
+    WATCH_MAX_BACKOFF = 8
+    WATCH_X_RSS_HOST = ""
+
+    PLATFORM_PLUGINS: dict[str, list[str]] = {}
+
     ARTISTS_INFO_FILE = "artists_info.yaml"
     ARTISTS_ALT_HANDLES_FILE = "artists_alt_handles.yaml"
+    ARTISTS_ALT_HANDLES_HASH_FILE = "artists_alt_handles.hash.json"
+    SENT_INDEX_FILE = "sent_index.sqlite3"
+    IMAGE_HASH_INDEX_FILE = "image_hashes"
+    FILE_ID_CACHE_FILE = "file_ids.sqlite3"
+    JOURNAL_FILE = "journal.jsonl"
+    LINK_CACHE_FILE = "link_cache.sqlite3"
+    AUDIT_REPORT_FILE = "link_audit.json"
+    WATCH_STATE_FILE = "watch_state.json"
+
+    REPOST_DETECTION = True
+    REPOST_MAX_DISTANCE = 6
+    MEDIA_DOWNLOAD_TIMEOUT = 30
+    REUSE_FILE_IDS = True
+
+    PREPROCESS_IMAGES = False
+    PREPROCESS_PROCESSES = 2
+    PHOTO_MAX_SIDE = 2560
+    PHOTO_MAX_MB = 5
+    ORIGINALS_AS_DOCUMENTS = True
@@ -18,14 +18,33 @@ class MsgSign:
     MORE_HASHTAGS = "More hashtags"
     COMPOSE = "Composing message"
     SEND = "Sending to Telegram"
+    AUTO_MODE = "Auto mode, known artist"
 
 
 class Msg:
     ZERO_2_CANCEL = highlight("Type <|0|> to cancel the process at any time")
     DEBUG_ENABLED = "Debug mode is enabled, scraper will not send any message to telegram"
-    ENTER_POST_URL = highlight("<|<post>|> || <|/irl <post>>|> || <|/login <site>|>")
+    ENTER_POST_URL = highlight(
+        "<|<post> ...|> || <|/irl <post>|> || <|/thread <post>|> || <|/resend <post>|> || "
+        "<|/login <site>|> || <|/auto|>"
+    )
     CLOSING_SESSION = "Closing session..."
     DOESNT_MATCH_PATTERN = "The url doesn't match pattern for a post"
+    RESUME_JOURNAL = highlight(
+        "{} post(s) from the last session weren't finished, <|Enter|> to resume, <|0|> to drop: "
+    )
+    RESUMED = "Resuming, already done: {}"
+    GALLERY_POSTS = "{} post(s) in the gallery that weren't sent yet"
+    WATCHING = "Watching {} gallery(ies) every {} seconds, Ctrl+C to stop"
+    WATCH_NEW_POSTS = "{} new post(s) in the watched galleries"
+    WATCH_STARTING_POINT = "Watching {} from its newest post on"
+    AUDIT_DONE = highlight("{} link(s) checked, <|{} invalid|>, <|{} unreachable|>, report written to {}")
+    ALREADY_SENT = highlight("Already sent on {}, use <|/resend <post>|> to send it again")
+    AUTO_MODE_ON = "Auto mode enabled, posts by known artists are sent without asking"
+    AUTO_MODE_OFF = "Auto mode disabled"
+    AUTO_MODE_INVALID_LINKS = "Auto mode: sending anyway, fix them later"
+    AUTO_MODE_SKIP_REPOST = "Auto mode: skipped, use /resend <post> to send it anyway"
+    SEND_REPOST_ANYWAY = highlight("Press <|Enter|> to send it anyway or <|0|> to skip it: ")
 
     MORE_HASHTAGS = "# not included (separated by a space): "
     SELECT_HANDLE = highlight(
@@ -46,4 +65,30 @@ class MsgErr:
     CANNOT_GET_USERNAME = "Cannot get artist username"
     ARTIST_NOT_FOUND = "Artist not found in database"
     FOUND_INVALID_LINKS = "Found invalid social media links"
+    CANNOT_SCRAPE = "Cannot scrape the post"
     BOT_API_KEY_NOT_SET = "Bot API key not set"
+    CHAT_ID_NOT_SET = "Chat ID not set, run without arguments to get it"
+    LIKELY_REPOST = highlight("Likely a repost, the same image(s) were sent with <|{}|> ({} bits apart)")
+    WATCH_NO_ARTISTS = "watch_artists in config.yaml is empty"
+    WATCH_UNKNOWN_ARTIST = highlight("<|{}|> in watch_artists is not in the database")
+    WATCH_NEEDS_INPUT = "Can't be sent without answering the prompts, it's kept for the next interactive session"
+
+
+class DaemonMsg:
+    LISTENING = "Daemon is listening for post urls ({} workers)"
+    CLOSING = "Waiting for workers to finish..."
+    NOT_A_SUBMITTER = "You're not allowed to submit posts, add {} to daemon_submitters in config.yaml"
+    NO_URL = "Send a post url, /irl <post url>, /thread <post url>, or reply /send or /cancel to a preview"
+    QUEUED = "Queued {} post(s), {} in queue"
+    DOESNT_MATCH_PATTERN = "The url doesn't match pattern for a post"
+    SCRAPE_FAILED = "Cannot scrape the post"
+    ALREADY_SENT = "Already sent, use /resend <post> in the terminal to send it again"
+    BLACKLISTED = "{} is blacklisted"
+    ARTIST_NOT_FOUND = "{} is not in the database, add them from the terminal first"
+    INVALID_LINKS = "⚠️ Invalid social links: {}"
+    LIKELY_REPOST = "⚠️ Likely a repost of {} ({} bits apart)"
+    CONFIRM = "{} media. Reply /send to post it or /cancel to drop it"
+    REPLY_TO_PREVIEW = "Reply to a preview message"
+    SENT = "Sent"
+    CANCELLED = "Cancelled"
+    ERROR = "❌ {}\n{}"
@@ -1,19 +1,9 @@
-from __future__ import annotations
-
-import sys
-
-from classes.PlatformFA import PlatformFA
-from classes.PlatformTwitter import PlatformTwitter
-
-if sys.version_info >= (3, 11):
-    from typing import TYPE_CHECKING
-else:
-    from typing_extensions import TYPE_CHECKING
-
-if TYPE_CHECKING:
-    from classes.PlatformBase import PlatformBase
-
-hosts: dict[str, type[PlatformBase]] = {
-    "furaffinity.net": PlatformFA,
-    "twitter.com": PlatformTwitter,
-}
+from classes.PlatformRegistry import PlatformRegistry
+
+# More platforms can be added with hosts.register() or `platform_plugins` in config.yaml, without editing this file
+hosts = PlatformRegistry()
+hosts.register("classes.PlatformFA:PlatformFA", ["furaffinity.net"])
+hosts.register(
+    "classes.PlatformTwitter:PlatformTwitter",
+    ["twitter.com", "x.com", "fxtwitter.com", "vxtwitter.com", "fixupx.com", "fixvx.com", "twittpr.com"],
+)